@@ -0,0 +1,139 @@
+"""
+Per-variant time and peak memory of the fused enhancement engine versus the
+ImageEnhance chain it replaced.
+
+    python -m benchmarks.bench_variant_enhance [image] [--size 1024] [--runs 5]
+
+Each (engine, style) pair runs in a fresh process so peak RSS is not shared.
+"""
+
+import argparse
+import io
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+from PIL import Image, ImageEnhance, ImageFilter
+
+from services.banner_variant_service import BannerVariantService
+from services.variant_enhancer import enhance_image
+
+
+def chain_enhance(image: Image.Image, params: dict) -> Image.Image:
+    """The ImageEnhance chain BannerVariantService used before the engine"""
+    enhanced = image.copy()
+    enhanced = ImageEnhance.Brightness(enhanced).enhance(params["brightness"])
+    enhanced = ImageEnhance.Contrast(enhanced).enhance(params["contrast"])
+    enhanced = ImageEnhance.Color(enhanced).enhance(params["saturation"])
+    if params["sharpness"] > 0:
+        enhanced = ImageEnhance.Sharpness(enhanced).enhance(params["sharpness"])
+    if params["smoothness"] > 0:
+        enhanced = enhanced.filter(ImageFilter.GaussianBlur(params["smoothness"]))
+    return enhanced
+
+
+ENGINES = {"chain": chain_enhance, "fused": enhance_image}
+
+
+def load_image(path: str, size: int) -> Image.Image:
+    if path:
+        return Image.open(path).convert("RGB")
+    # smooth gradients with noise, closer to a banner than pure noise
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32) / size
+    rng = np.random.default_rng(0)
+    pixels = np.stack([x * 255, y * 255, (1 - x) * 200], axis=-1)
+    pixels += rng.normal(0, 12, pixels.shape)
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+
+
+def _reset_peak_rss() -> int:
+    """Reset the peak RSS where Linux allows it, returns the baseline in KiB"""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return _current_rss()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _current_rss() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def _peak_rss() -> int:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run(engine: str, style: str, image_bytes: bytes, runs: int, results):
+    image = Image.open(io.BytesIO(image_bytes))
+    image.load()
+    params = BannerVariantService()._get_style_params(style)
+    enhance = ENGINES[engine]
+
+    baseline_kb = _reset_peak_rss()
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        enhance(image, params)
+        timings.append(time.perf_counter() - started)
+    peak_kb = _peak_rss() - baseline_kb
+
+    results.put((engine, style, min(timings), peak_kb))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("image", nargs="?", default="")
+    parser.add_argument("--size", type=int, default=1024)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    image = load_image(args.image, args.size)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+
+    styles = list(BannerVariantService().variation_dict)
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    measured = {}
+    for style in styles:
+        for engine in ENGINES:
+            process = context.Process(
+                target=_run,
+                args=(engine, style, buffer.getvalue(), args.runs, results),
+            )
+            process.start()
+            process.join()
+            _, _, seconds, peak_kb = results.get()
+            measured[engine, style] = (seconds, peak_kb)
+
+    print(f"image {image.size[0]}x{image.size[1]} {image.mode}, best of {args.runs}")
+    print(f"{'style':<10}{'engine':<8}{'ms':>10}{'peak MiB':>10}{'mean diff':>10}")
+    for style in styles:
+        params = BannerVariantService()._get_style_params(style)
+        diff = np.abs(
+            np.asarray(chain_enhance(image, params), dtype=np.int16)
+            - np.asarray(enhance_image(image, params), dtype=np.int16)
+        ).mean()
+        for engine in ENGINES:
+            seconds, peak_kb = measured[engine, style]
+            print(
+                f"{style:<10}{engine:<8}{seconds * 1000:>10.1f}"
+                f"{peak_kb / 1024:>10.1f}{f'{diff:.2f}' if engine == 'fused' else '':>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
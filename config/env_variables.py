@@ -1,5 +1,7 @@
 from pathlib import Path
+from typing import Any, Dict
 from pydantic import Field
+from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 DOT_ENV_FILE = Path(__file__).resolve().parent.parent / ".env"
@@ -33,6 +35,178 @@ class Settings(BaseSettings):
         default="http://localhost:3000", description="Origins allowed for headers"
     )
 
+    # browser pool
+    BROWSER_POOL_SIZE: int = Field(
+        default=2, description="Number of pre-launched Chromium processes"
+    )
+    BROWSER_POOL_MAX_CONCURRENCY: int = Field(
+        default=8, description="Maximum concurrent browser leases across the pool"
+    )
+    BROWSER_POOL_LEASE_TIMEOUT: float = Field(
+        default=30.0, description="Seconds a request waits for a browser lease"
+    )
+    BROWSER_POOL_MAX_QUEUE: int = Field(
+        default=32, description="Maximum requests waiting for a browser lease"
+    )
+
+    BROWSER_RECYCLE_MAX_PAGES: int = Field(
+        default=200, description="Pages a browser serves before it is recycled"
+    )
+    BROWSER_RECYCLE_MAX_RSS_MB: int = Field(
+        default=1536, description="Browser RSS in MB that triggers a recycle"
+    )
+    BROWSER_RECYCLE_MAX_ERRORS: int = Field(
+        default=10, description="Crashes/timeouts before a browser is recycled"
+    )
+    BROWSER_RECYCLE_MAX_AGE: float = Field(
+        default=6 * 60 * 60, description="Seconds a browser lives before recycle"
+    )
+    BROWSER_WATCHDOG_INTERVAL: float = Field(
+        default=30.0, description="Seconds between browser health samples"
+    )
+
+    # http fast path
+    HTTP_FAST_PATH_ENABLED: bool = Field(
+        default=True, description="Try structured data over plain http first"
+    )
+    HTTP_FETCH_TIMEOUT: float = Field(
+        default=10.0, description="Timeout in seconds for plain http page fetches"
+    )
+
+    # crawl cache
+    CRAWL_CACHE_TTL_SECONDS: int = Field(
+        default=24 * 60 * 60, description="Seconds a crawl result stays cached"
+    )
+    CRAWL_CACHE_MAX_ENTRIES: int = Field(
+        default=1024, description="Entries kept in the in-process crawl cache"
+    )
+
+    # bulk crawl
+    BULK_CRAWL_MAX_URLS: int = Field(
+        default=500, description="Maximum urls accepted by one bulk crawl request"
+    )
+    BULK_CRAWL_CONCURRENCY: int = Field(
+        default=8, description="Concurrent crawls across all bulk requests"
+    )
+    BULK_CRAWL_PER_DOMAIN_CONCURRENCY: int = Field(
+        default=2, description="Concurrent crawls of a single domain"
+    )
+    BULK_CRAWL_POLITENESS_DELAY: float = Field(
+        default=1.0, description="Seconds between crawl starts on the same domain"
+    )
+
+    # model response cache
+    MODEL_CACHE_ENABLED: bool = Field(
+        default=True, description="Reuse responses of identical model calls"
+    )
+    MODEL_CACHE_MAX_ENTRIES: int = Field(
+        default=256, description="Responses kept in the in-process model cache"
+    )
+    MODEL_CACHE_MAX_MEMORY_MB: int = Field(
+        default=64, description="Size limit of the in-process model cache"
+    )
+    MODEL_CACHE_TTL_SECONDS: int = Field(
+        default=24 * 60 * 60,
+        description="Seconds a cached model response stays valid, 0 never expires",
+    )
+    MODEL_CACHE_DIR: str = Field(
+        default=".cache/model_responses",
+        description="Directory of the on-disk model response cache",
+    )
+    MODEL_CACHE_MAX_DISK_MB: int = Field(
+        default=512, description="Size limit of the on-disk model response cache"
+    )
+
+    # model deadlines and hedging
+    MODEL_CALL_DEADLINE: float = Field(
+        default=90.0, description="Seconds a model call may take, 0 disables"
+    )
+    MODEL_HEDGING_ENABLED: bool = Field(
+        default=True, description="Hedge slow text model calls with a duplicate"
+    )
+    MODEL_HEDGE_PERCENTILE: float = Field(
+        default=95.0, description="Latency percentile after which a call is hedged"
+    )
+    MODEL_HEDGE_MIN_SAMPLES: int = Field(
+        default=20, description="Latency samples needed before hedging starts"
+    )
+    MODEL_LATENCY_WINDOW: int = Field(
+        default=200, description="Recent call latencies kept per model"
+    )
+
+    # product extraction
+    PRODUCT_EXTRACTION_MODE: str = Field(
+        default="vision",
+        description="vision (screenshot) or text (distilled page text) model input",
+    )
+    DISTILLED_TEXT_MAX_CHARS: int = Field(
+        default=4000, description="Cap of the page text sent in text mode"
+    )
+
+    # background jobs
+    JOB_TTL_SECONDS: int = Field(
+        default=60 * 60, description="Seconds finished jobs stay readable"
+    )
+    VEO_POLL_INITIAL_INTERVAL: float = Field(
+        default=10.0, description="Seconds before the first veo operation poll"
+    )
+    VEO_POLL_MAX_INTERVAL: float = Field(
+        default=60.0, description="Upper bound of the veo poll backoff"
+    )
+    VEO_EXPECTED_SECONDS: float = Field(
+        default=120.0, description="Typical veo generation time, for progress"
+    )
+    VEO_MAX_SECONDS: float = Field(
+        default=20 * 60, description="Seconds before an unfinished veo job fails"
+    )
+    VEO_MAX_POLL_FAILURES: int = Field(
+        default=10, description="Consecutive failed polls before a veo job fails"
+    )
+    VARIANT_RENDER_WORKERS: int = Field(
+        default=0, description="Variant rendering processes, 0 uses every core"
+    )
+    BANNER_ENCODING_PROFILES: Dict[str, Dict[str, Any]] = Field(
+        default={},
+        description="Per platform (or \"default\") format, quality and preview overrides",
+    )
+    VARIANT_DEDUPE_MODE: str = Field(
+        default="regenerate",
+        description="Near-duplicate variants: regenerate, reject or off",
+    )
+    VARIANT_DEDUPE_MAX_DISTANCE: int = Field(
+        default=4, description="Hamming distance of dhashes counted as same layout"
+    )
+    VARIANT_DEDUPE_MAX_COLOR_DISTANCE: int = Field(
+        # style presets of one base land 3+ levels apart on flat banners
+        default=2,
+        description="Colour signature difference, in levels, counted as same colours",
+    )
+    VARIANT_DEDUPE_MAX_ATTEMPTS: int = Field(
+        default=2, description="Regeneration rounds before duplicates are kept"
+    )
+    VARIANT_DEDUPE_AGAINST_EXISTING: bool = Field(
+        default=False,
+        description="Also treat the product's earlier variants as duplicates",
+    )
+    OG_BANNER_WORKERS: int = Field(
+        default=4, description="OG banner jobs generated concurrently"
+    )
+    OG_BANNER_QUEUE_SIZE: int = Field(
+        default=64, description="OG banner jobs waiting before new ones are rejected"
+    )
+
+    # model call scheduler
+    MODEL_QUEUE_MAX_SIZE: int = Field(
+        default=64, description="Calls queued per model before new ones are rejected"
+    )
+    MODEL_QUEUE_TIMEOUT: float = Field(
+        default=30.0, description="Seconds a call may wait for model capacity"
+    )
+    MODEL_RATE_LIMITS: Dict[str, Dict[str, int]] = Field(
+        default={},
+        description="Per model overrides of concurrency, rpm and tpm limits",
+    )
+
     @property
     def get_database_url(self) -> str:
         """
@@ -42,8 +216,9 @@ class Settings(BaseSettings):
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}"
 
 
+@lru_cache
 def get_settings() -> Settings:
     """
-    Get the settings for the application.
+    Get the settings for the application, read from the environment once.
     """
     return Settings()
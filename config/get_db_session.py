@@ -1,6 +1,10 @@
 from typing import AsyncGenerator
 from core.utils.logger import Logger
-from models.banner_var_model import Base
+from models.banner_var_model import BannerVariant, Base
+from models.crawl_cache_model import CrawlCacheEntry  # registers the table
+from models.domain_profile_model import DomainProfile  # registers the table
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine
 
@@ -13,12 +17,39 @@ logger = Logger.get_logger(
 )
 
 
+# columns added to tables that already exist in deployed databases,
+# create_all only creates missing tables
+ADDED_COLUMNS = [
+    DomainProfile.__table__.c.extraction_mode,
+    BannerVariant.__table__.c.platform,
+    BannerVariant.__table__.c.phash,
+    BannerVariant.__table__.c.color_hash,
+]
+
+
+def add_missing_columns(conn: Connection):
+    """Add ADDED_COLUMNS and their indexes where they do not exist yet."""
+    for column in ADDED_COLUMNS:
+        table = column.table
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(
+            text(
+                f"ALTER TABLE {table.name} "
+                f"ADD COLUMN IF NOT EXISTS {column.name} {column_type}"
+            )
+        )
+        for index in table.indexes:
+            if column in index.columns.values():
+                index.create(conn, checkfirst=True)
+
+
 async def init_db():
     try:
         engine = create_async_engine(settings.get_database_url, echo=True)
 
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(add_missing_columns)
 
         await engine.dispose()
     except Exception as e:
@@ -0,0 +1,164 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from config.db_config import AsyncSessionLocal
+from core.utils.logger import Logger
+from models.domain_profile_model import DomainProfile
+from utils.type_cast import extract_price, extract_stock
+
+# selector roles reported by extract_product_info.js in matched_selectors
+SELECTOR_ROLES = ("product", "title", "price", "description")
+
+# a field is trusted to the DOM once it came from it in enough crawls
+MIN_FIELD_OBSERVATIONS = 3
+DOM_RELIABILITY_RATIO = 0.9
+
+
+def dom_field_values(product_info: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Map extract_product_info.js output onto the llm prompt fields it can
+    provide. Only fields with a usable value are returned.
+    """
+    values = {
+        "sale_price": extract_price(
+            product_info.get("sale_price") or product_info.get("price")
+        ),
+        "regular_price": extract_price(product_info.get("regular_price")),
+        "description": (product_info.get("description") or "").strip(),
+        "stock": extract_stock(product_info.get("availability")),
+    }
+    return {name: value for name, value in values.items() if value}
+
+
+@dataclass
+class DomainExtractionProfile:
+    domain: str
+    selectors: Dict[str, Optional[str]] = field(default_factory=dict)
+    field_sources: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    crawl_count: int = 0
+    extraction_mode: Optional[str] = None
+
+    def reliable_dom_fields(self) -> Set[str]:
+        """Fields the DOM provided in nearly every crawl of this domain"""
+        reliable = set()
+        for name, counts in self.field_sources.items():
+            dom = counts.get("dom", 0)
+            total = dom + counts.get("llm", 0)
+            if total >= MIN_FIELD_OBSERVATIONS and dom / total >= DOM_RELIABILITY_RATIO:
+                reliable.add(name)
+        return reliable
+
+    def record(
+        self, matched_selectors: Dict[str, Optional[str]], sources: Dict[str, str]
+    ):
+        """
+        Args:
+            matched_selectors: role -> selector that matched on this crawl
+            sources: field -> "dom" or "llm"
+        """
+        for role in SELECTOR_ROLES:
+            if matched_selectors.get(role):
+                self.selectors[role] = matched_selectors[role]
+
+        for name, source in sources.items():
+            counts = self.field_sources.setdefault(name, {"dom": 0, "llm": 0})
+            counts[source] = counts.get(source, 0) + 1
+
+        self.crawl_count += 1
+
+
+class DomainProfileStore:
+    """Per-domain extraction profiles cached in memory and persisted to postgres"""
+
+    def __init__(self):
+        self.logger = Logger.get_logger(__name__)
+        self._profiles: Dict[str, DomainExtractionProfile] = {}
+
+    async def get(self, domain: str) -> DomainExtractionProfile:
+        profile = self._profiles.get(domain)
+        if profile is not None:
+            return profile
+
+        profile = DomainExtractionProfile(domain=domain)
+        try:
+            async with AsyncSessionLocal() as db:
+                row = await db.scalar(
+                    select(DomainProfile).where(DomainProfile.domain == domain)
+                )
+            if row is not None:
+                profile.selectors = {
+                    "product": row.product_selector,
+                    "title": row.title_selector,
+                    "price": row.price_selector,
+                    "description": row.description_selector,
+                }
+                profile.field_sources = row.field_sources or {}
+                profile.crawl_count = row.crawl_count or 0
+                profile.extraction_mode = row.extraction_mode
+        except Exception as e:
+            self.logger.error(f"Failed to load domain profile for {domain}: {e}")
+
+        self._profiles[domain] = profile
+        return profile
+
+    async def record(
+        self,
+        profile: DomainExtractionProfile,
+        matched_selectors: Dict[str, Optional[str]],
+        sources: Dict[str, str],
+    ):
+        """Update the profile with the outcome of a crawl and persist it."""
+        profile.record(matched_selectors, sources)
+        await self._save(profile)
+
+    async def set_extraction_mode(
+        self, domain: str, extraction_mode: Optional[str]
+    ) -> DomainExtractionProfile:
+        """Switch a domain between text and vision extraction, None resets it."""
+        profile = await self.get(domain)
+        profile.extraction_mode = extraction_mode
+        await self._save(profile)
+        return profile
+
+    async def _save(self, profile: DomainExtractionProfile):
+        values = {
+            "domain": profile.domain,
+            "product_selector": profile.selectors.get("product"),
+            "title_selector": profile.selectors.get("title"),
+            "price_selector": profile.selectors.get("price"),
+            "description_selector": profile.selectors.get("description"),
+            "field_sources": profile.field_sources,
+            "crawl_count": profile.crawl_count,
+            "extraction_mode": profile.extraction_mode,
+        }
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    insert(DomainProfile)
+                    .values(**values)
+                    .on_conflict_do_update(
+                        index_elements=[DomainProfile.domain],
+                        set_={k: v for k, v in values.items() if k != "domain"},
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            self.logger.error(
+                f"Failed to persist domain profile for {profile.domain}: {e}"
+            )
+
+
+_domain_profile_store: Optional[DomainProfileStore] = None
+
+
+def get_domain_profile_store() -> DomainProfileStore:
+    """
+    Get the process-wide domain profile store.
+    """
+    global _domain_profile_store
+
+    if _domain_profile_store is None:
+        _domain_profile_store = DomainProfileStore()
+    return _domain_profile_store
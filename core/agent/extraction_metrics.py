@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from core.agent.field_coverage import REQUIRED_FIELDS
+from core.prompt.product_info_prompt import PRODUCT_PROMPT_FIELDS
+
+
+@dataclass
+class ExtractionModeStats:
+    crawls: int = 0
+    model_calls: int = 0
+    total_seconds: float = 0.0
+    model_seconds: float = 0.0
+    completeness: float = 0.0
+    required_complete: int = 0
+
+    def as_dict(self) -> dict:
+        crawls = self.crawls or 1
+        return {
+            "crawls": self.crawls,
+            "model_calls": self.model_calls,
+            "avg_latency": round(self.total_seconds / crawls, 3),
+            "avg_model_latency": round(self.model_seconds / (self.model_calls or 1), 3),
+            "avg_completeness": round(self.completeness / crawls, 3),
+            "required_complete_rate": round(self.required_complete / crawls, 3),
+        }
+
+
+class ExtractionMetrics:
+    """Latency and field completeness of product extraction per mode"""
+
+    def __init__(self):
+        self._modes: Dict[str, ExtractionModeStats] = {}
+
+    def record(
+        self,
+        mode: str,
+        result: Dict[str, Any],
+        elapsed: float,
+        model_elapsed: Optional[float] = None,
+    ):
+        """
+        Args:
+            mode: structured, vision or text
+            result: final product fields of the crawl
+            elapsed: seconds spent on the whole crawl
+            model_elapsed: seconds spent on the model call, None when skipped
+        """
+        stats = self._modes.setdefault(mode, ExtractionModeStats())
+        stats.crawls += 1
+        stats.total_seconds += elapsed
+        if model_elapsed is not None:
+            stats.model_calls += 1
+            stats.model_seconds += model_elapsed
+
+        filled = [name for name in PRODUCT_PROMPT_FIELDS if result.get(name)]
+        stats.completeness += len(filled) / len(PRODUCT_PROMPT_FIELDS)
+        if all(result.get(name) for name in REQUIRED_FIELDS):
+            stats.required_complete += 1
+
+    def as_dict(self) -> dict:
+        return {mode: stats.as_dict() for mode, stats in self._modes.items()}
+
+
+_extraction_metrics: Optional[ExtractionMetrics] = None
+
+
+def get_extraction_metrics() -> ExtractionMetrics:
+    """
+    Get the process-wide product extraction metrics.
+    """
+    global _extraction_metrics
+
+    if _extraction_metrics is None:
+        _extraction_metrics = ExtractionMetrics()
+    return _extraction_metrics
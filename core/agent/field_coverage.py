@@ -0,0 +1,184 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from core.agent.domain_profile import dom_field_values
+from core.prompt.product_info_prompt import PRODUCT_PROMPT_FIELDS
+from global_type.product_base import ProductIndustryEnum, ProductTemplateEnum
+from utils.type_cast import extract_price, extract_stock
+
+# fields a banner cannot be built without
+REQUIRED_FIELDS = ("name", "sale_price", "currency", "category", "description")
+
+# values used for prompt fields no source provides and no model call fills
+FIELD_DEFAULTS = {
+    "offer": "",
+    "template_type": ProductTemplateEnum.MODERN.value,
+    "stock": "no_inventory_found",
+    "aspect_ratio": "9:16",
+    "duration": "8 sec",
+}
+
+CURRENCY_SYMBOLS = {"₹": "INR", "$": "USD", "€": "EUR", "£": "GBP"}
+
+CATEGORY_KEYWORDS = {
+    ProductIndustryEnum.FASHION: (
+        "apparel clothing fashion shirt dress jeans shoe sneaker kurta saree "
+        "jacket bag watch jewel"
+    ).split(),
+    ProductIndustryEnum.ELECTRONICS: (
+        "electronic phone laptop computer headphone earbud camera speaker "
+        "charger television tablet gaming"
+    ).split(),
+    ProductIndustryEnum.HOME_DECOR: (
+        "home decor furniture kitchen bedding lamp rug curtain sofa vase"
+    ).split(),
+    ProductIndustryEnum.STATIONARY: (
+        "stationery stationary notebook pen pencil diary office"
+    ).split(),
+    ProductIndustryEnum.BEAUTY_AND_COSMETICS: (
+        "beauty cosmetic makeup skincare lipstick serum perfume fragrance shampoo"
+    ).split(),
+    ProductIndustryEnum.FOOD_AND_BEVERAGE: (
+        "food beverage grocery snack coffee tea chocolate drink spice"
+    ).split(),
+}
+
+
+def infer_category(*texts: Optional[str]) -> str:
+    """Map breadcrumb/schema category or title text onto ProductIndustryEnum"""
+    for text in texts:
+        text = (text or "").lower()
+        if not text:
+            continue
+        words = re.findall(r"\w+", text)
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            # prefix match so plurals ("shoes", "phones") count
+            if any(word.startswith(keyword) for word in words for keyword in keywords):
+                return category.value
+    return ""
+
+
+def infer_currency(*prices: Optional[str]) -> str:
+    for price in prices:
+        for symbol, code in CURRENCY_SYMBOLS.items():
+            if symbol in str(price or ""):
+                return code
+    return ""
+
+
+def _offer(sale_price: str, regular_price: str) -> str:
+    try:
+        sale, regular = float(sale_price), float(regular_price)
+    except (TypeError, ValueError):
+        return ""
+    if regular <= sale or regular <= 0:
+        return ""
+    return f"{round((regular - sale) / regular * 100)}% off"
+
+
+def _structured_fields(structured: Dict[str, Any]) -> Dict[str, Any]:
+    """Prompt fields read from JSON-LD / OpenGraph (product_from_structured_data)"""
+    sale_price = extract_price(structured.get("sale_price") or structured.get("price"))
+    return {
+        "name": structured.get("title", ""),
+        "sale_price": sale_price,
+        "currency": structured.get("currency")
+        or infer_currency(structured.get("price")),
+        "category": infer_category(structured.get("category"), structured.get("title")),
+        "description": structured.get("description", ""),
+        "ratings": structured.get("ratings", ""),
+        "stock": extract_stock(structured.get("availability")),
+    }
+
+
+@dataclass
+class FieldCoverage:
+    """
+    ProductBase shaped prompt fields merged from every non-model source.
+
+    `values` are trusted and win over the model, `fallbacks` are heuristic DOM
+    values only used when the model is not called or leaves a field empty.
+    """
+
+    values: Dict[str, Any] = field(default_factory=dict)
+    fallbacks: Dict[str, Any] = field(default_factory=dict)
+    sources: Dict[str, str] = field(default_factory=dict)
+
+    def model_fields(self) -> List[str]:
+        """
+        Prompt fields no other source covered, the ones to ask the model for.
+        The creative fields (features, palette, style, cta...) only ever come
+        from the model, so this is never empty.
+        """
+        return [name for name in PRODUCT_PROMPT_FIELDS if not self.values.get(name)]
+
+    def merge(self, model_response: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Final prompt field values: defaults < fallbacks < model < trusted"""
+        merged = dict(FIELD_DEFAULTS)
+        merged.update({k: v for k, v in self.fallbacks.items() if v})
+        merged.update({k: v for k, v in (model_response or {}).items() if v})
+        merged.update({k: v for k, v in self.values.items() if v})
+        return merged
+
+
+def build_field_coverage(
+    structured: Optional[Dict[str, Any]] = None,
+    dom: Optional[Dict[str, Any]] = None,
+    trusted_dom_fields: Iterable[str] = (),
+) -> FieldCoverage:
+    """
+    Merge JSON-LD/OpenGraph data and DOM extraction into prompt fields.
+    Args:
+        structured: product_from_structured_data output
+        dom: extract_product_info.js output for the main product
+        trusted_dom_fields: fields the domain profile proved the DOM provides
+    Returns:
+        FieldCoverage with the trusted values, DOM fallbacks and their sources
+    """
+    coverage = FieldCoverage()
+    trusted: Set[str] = set(trusted_dom_fields)
+
+    for name, value in _structured_fields(structured or {}).items():
+        if value:
+            coverage.values[name] = value
+            coverage.sources[name] = "structured"
+
+    dom = dom or {}
+    title = dom.get("title") or ""
+    dom_values = {
+        **dom_field_values(dom),
+        "name": title if title != "Unknown Product" else "",
+        "currency": infer_currency(
+            dom.get("sale_price") or dom.get("price"), dom.get("regular_price")
+        ),
+        "category": infer_category(dom.get("category")),
+    }
+    for name, value in dom_values.items():
+        if not value or coverage.values.get(name):
+            continue
+        if name in trusted:
+            coverage.values[name] = value
+            coverage.sources[name] = "dom"
+        else:
+            coverage.fallbacks[name] = value
+
+    # derived fields only come from trusted prices
+    sale_price = coverage.values.get("sale_price")
+    regular_price = coverage.values.get("regular_price")
+    if (
+        sale_price
+        and not regular_price
+        and not coverage.fallbacks.get("regular_price")
+        and coverage.sources["sale_price"] == "structured"
+    ):
+        # structured data only exposes the selling price when there is no offer
+        coverage.values["regular_price"] = sale_price
+        coverage.sources["regular_price"] = "structured"
+    if sale_price and regular_price:
+        offer = _offer(sale_price, regular_price)
+        if offer:
+            coverage.values["offer"] = offer
+            coverage.sources["offer"] = coverage.sources["regular_price"]
+
+    return coverage
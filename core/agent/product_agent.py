@@ -1,13 +1,36 @@
-from encodings.base64_codec import base64_decode
-from typing import Any, Dict, Optional, Tuple
-from PIL import Image
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from google.genai import types
 
+from core.agent.domain_profile import dom_field_values, get_domain_profile_store
+from core.agent.extraction_metrics import get_extraction_metrics
+from core.agent.field_coverage import FieldCoverage, build_field_coverage
 from core.agent.types import ProductAgentResponseType
 from core.browser.browser import Browser, BrowserConfig
+from core.browser.browser_pool import get_browser_pool
+from core.browser.http_page import fetch_page_bundle, has_required_fields
+from core.browser.screenshot_regions import product_screenshot_clips
+from core.browser.structured_data import product_from_structured_data
 from core.prompt.product_info_prompt import get_product_prompt
 from core.utils.logger import Logger
 from core.model.llm import initialize_gemini as gemini_client
+from config.env_variables import get_settings
 from global_type.product_base import ProductBase
+from utils.url import canonicalize_url
+
+
+PRODUCT_INFO_MODEL_CONFIG = {
+    "response_mime_type": "application/json",
+    # "response_schema": ProductBase,
+    "responseModalities": ["TEXT"],
+}
+
+MAX_STRUCTURED_DATA_CHARS = 8000
+
+# prompt fields whose source (dom or llm) is tracked per domain
+DOM_PROVIDED_FIELDS = ("sale_price", "regular_price", "description", "stock")
 
 
 class ProductAgent:
@@ -18,52 +41,185 @@ class ProductAgent:
 
     async def crawl_product_page(self, product_url: str):
 
-        async with Browser(config=BrowserConfig()) as browser:
+        fast_path_result = await self._crawl_with_http(product_url)
+        if fast_path_result is not None:
+            return fast_path_result
+
+        return await self._crawl_with_browser(product_url)
+
+    async def _crawl_with_browser(self, product_url: str):
+        """
+        Render the page, extract DOM data using the learned domain profile and
+        let the model fill only the fields no other source covered, from a
+        screenshot (vision mode) or the distilled page text (text mode).
+        """
+        started = time.monotonic()
+        profile_store = get_domain_profile_store()
+        profile = await profile_store.get(
+            urlsplit(canonicalize_url(product_url)).hostname or ""
+        )
+        extraction_mode = (
+            profile.extraction_mode or get_settings().PRODUCT_EXTRACTION_MODE
+        )
+
+        async with get_browser_pool().lease(BrowserConfig()) as browser:
             if not await self._extract_page_content(browser, product_url):
                 return {"error": "Content did not load successfully."}
 
             product_info, headers, metadata = await self._extract_and_validate_data(
-                browser
+                browser, selectors=profile.selectors
             )
             if not all([product_info, headers, metadata]):
                 return {"error": "Failed to extract required information."}
 
             self.logger.info("Metadata extracted successfully.")
 
-            product_image = await self._get_product_page_screenshot(browser)
-            prompt = get_product_prompt()
-            response = gemini_client(
-                content=[product_image, prompt],
-                config={
-                    "response_mime_type": "application/json",
-                    # "response_schema": ProductBase,
-                    "responseModalities": ["TEXT"],
-                },
+            regions = product_info.pop("regions", None)
+            coverage = build_field_coverage(
+                structured=product_from_structured_data(
+                    metadata.get("metadata"), product_url
+                ),
+                dom=product_info,
+                trusted_dom_fields=profile.reliable_dom_fields(),
             )
+            matched_selectors = product_info.get("matched_selectors") or {}
+            model_content, extraction_mode = await self._get_model_input(
+                browser,
+                extraction_mode,
+                regions=regions,
+                product_selector=matched_selectors.get("product")
+                or profile.selectors.get("product"),
+            )
+
+        # the browser lease is released before waiting on the model
+        model_started = time.monotonic()
+        model_response = await self._ask_model(model_content, coverage.model_fields())
+        model_elapsed = time.monotonic() - model_started
+
+        result, headers, metadata = self._get_product_info(
+            product_info,
+            coverage,
+            model_response,
+            headers=headers,
+            metadata=metadata,
+        )
+
+        dom_values = dom_field_values(product_info)
+        sources = {
+            name: "dom" if name in dom_values else "llm"
+            for name in DOM_PROVIDED_FIELDS
+            if name in dom_values or result.get(name)
+        }
+        await profile_store.record(
+            profile, product_info.get("matched_selectors") or {}, sources
+        )
 
-            return self._get_product_info(
-                product_info,
-                model_json=response.text,
-                headers=headers,
-                metadata=metadata,
+        get_extraction_metrics().record(
+            extraction_mode, result, time.monotonic() - started, model_elapsed
+        )
+        return result, headers, metadata
+
+    async def _get_model_input(
+        self,
+        browser: Browser,
+        extraction_mode: str,
+        regions: Optional[Dict[str, Any]] = None,
+        product_selector: Optional[str] = None,
+    ) -> Tuple[List[Any], str]:
+        """
+        Build the model input for the extraction mode.
+        Returns:
+            content parts and the mode actually used, text mode falls back to
+            vision when the page yields no text
+        """
+        if extraction_mode == "text":
+            text = await browser.distill_page_text(
+                product_selector, max_chars=get_settings().DISTILLED_TEXT_MAX_CHARS
             )
+            if text:
+                return [f"Product page text:\n{text}"], "text"
+            self.logger.warning("No page text distilled, using screenshot.")
 
-    def _get_product_info(
-        self, product_info: Dict[str, Any], model_json: str, **product_metadata
-    ):
-        model_response: Dict[str, str]
+        product_images = await self._get_product_page_screenshot(
+            browser, regions=regions
+        )
+        return product_images, "vision"
 
-        try:
-            import json
+    async def _crawl_with_http(self, product_url: str):
+        """
+        Fast path: read JSON-LD / OpenGraph data from the raw html and skip the
+        browser when it already carries the required product fields.
+        Returns None when the crawl has to escalate to the browser.
+        """
+        if not get_settings().HTTP_FAST_PATH_ENABLED:
+            return None
 
-            model_response = json.loads(model_json)
+        started = time.monotonic()
+        bundle = await fetch_page_bundle(product_url)
+        if not bundle:
+            return None
+
+        product_info = bundle["product_info"][0]
+        if not has_required_fields(product_info):
+            self.logger.info(
+                f"Structured data incomplete for {product_url}, using browser."
+            )
+            return None
+
+        self.logger.info(f"Using structured data fast path for {product_url}.")
+
+        coverage = build_field_coverage(structured=product_info)
+
+        structured_data = json.dumps(
+            {
+                "product": product_info,
+                "og_tags": bundle["metadata"]["metadata"].get("og_tags"),
+                "headers": bundle["headers"],
+            },
+            ensure_ascii=False,
+        )[:MAX_STRUCTURED_DATA_CHARS]
+        model_started = time.monotonic()
+        model_response = await self._ask_model(
+            [f"Product page structured data:\n{structured_data}"],
+            coverage.model_fields(),
+        )
+        model_elapsed = time.monotonic() - model_started
+
+        result = self._get_product_info(
+            product_info,
+            coverage,
+            model_response,
+            headers=bundle["headers"],
+            metadata=bundle["metadata"],
+        )
+        get_extraction_metrics().record(
+            "structured", result[0], time.monotonic() - started, model_elapsed
+        )
+        return result
+
+    async def _ask_model(self, content: List[Any], fields: List[str]) -> Dict[str, Any]:
+        """Ask the model for the given prompt fields only."""
+        response = await gemini_client(
+            content=[*content, get_product_prompt(fields=fields)],
+            config=PRODUCT_INFO_MODEL_CONFIG,
+        )
+
+        try:
+            return json.loads(response.text)
 
             # ProductBase.model_validate(model_response)
         except Exception as E:
             raise Exception("Invalid llm model response for product base")
 
+    def _get_product_info(
+        self,
+        product_info: Dict[str, Any],
+        coverage: FieldCoverage,
+        model_response: Dict[str, Any],
+        **product_metadata,
+    ):
         return (
-            product_info | model_response,
+            product_info | coverage.merge(model_response),
             product_metadata.get("headers"),
             product_metadata.get("metadata"),
         )
@@ -79,35 +235,75 @@ class ProductAgent:
     async def _extract_and_validate_data(
         self,
         browser: Browser,
+        selectors: Optional[Dict[str, str]] = None,
     ) -> Tuple[Optional[Dict], Optional[Dict], Optional[Dict]]:
         """Extract and validate all required data from the page."""
 
-        product_info = await browser.extract_product_info()
+        bundle = await browser.extract_page_bundle(
+            primary_only=True, profile=selectors
+        )
+        if not bundle:
+            return None, None, None
 
+        product_info = bundle["product_info"]
         if not product_info:
             self.logger.error("Failed to extract product information.")
             return None, None, None
 
-        headers = await browser.extract_headers()
+        headers = bundle["headers"]
         if not headers:
             self.logger.error("Failed to extract headers.")
             return None, None, None
 
-        metadata = await browser.extract_metadata()
+        metadata = bundle["metadata"]
         if not metadata:
             self.logger.error("Failed to extract metadata.")
             return None, None, None
 
         return product_info[0], headers, metadata
 
-    async def _get_product_page_screenshot(self, browser: Browser):
-        """Get screenshot for the product page"""
-        import base64
-        from io import BytesIO
+    async def _get_product_page_screenshot(
+        self, browser: Browser, regions: Optional[Dict[str, Any]] = None
+    ) -> List[types.Part]:
+        """
+        Screenshot only the product region(s) found by the DOM extraction,
+        falling back to the viewport when the page has no usable product box.
+        """
+
+        config = browser.config
+        image_format = config.screenshot_format
+
+        clips = (
+            product_screenshot_clips(regions, max_tiles=config.max_region_tiles)
+            if regions
+            else []
+        )
+        screenshots = []
+        for clip in clips:
+            screenshot_bytes = await browser.capture_screenshot(
+                width=config.region_screenshot_width,
+                image_format=image_format,
+                clip=clip,
+            )
+            if screenshot_bytes:
+                screenshots.append(screenshot_bytes)
+
+        if screenshots:
+            self.logger.info(f"Captured {len(screenshots)} product region tiles.")
+        else:
+            screenshot_bytes = await browser.capture_screenshot(
+                image_format=image_format
+            )
+            if screenshot_bytes:
+                screenshots.append(screenshot_bytes)
+            else:
+                # the model is still asked, from the prompt alone
+                self.logger.warning("Screenshot capture failed, sending text only.")
 
-        base64_str = await browser.get_screenshot()
-        image_data = base64.b64decode(base64_str)
-        return Image.open(BytesIO(image_data))
+        return [
+            types.Part.from_bytes(data=data, mime_type=f"image/{image_format}")
+            for data in screenshots
+        ]
 
     # async def _get_complete_product_info():
     #     """Get all the missing product info using screenshot passing it to reasoning llm"""
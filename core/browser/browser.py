@@ -1,12 +1,17 @@
 import asyncio
 import base64
 import io
-from typing import List
+from typing import List, Optional, Union
 from dataclasses import dataclass, field
 from importlib import resources
-from playwright.async_api import async_playwright, Browser as PlaywrightBrowser, Page
+from playwright.async_api import (
+    async_playwright,
+    Browser as PlaywrightBrowser,
+    BrowserContext,
+    Page,
+)
 from PIL import Image
-from core.browser.utils import scale_b64_image
+from core.browser.request_policy import RequestInterceptor, RequestStats, RoutingPolicy
 from core.utils.logger import Logger
 
 
@@ -25,28 +30,62 @@ class BrowserConfig:
     browser_type: str = "chromium"
     ignoreHTTPSErrors: bool = True
     timeout: int = 30000
+    routing_policy: RoutingPolicy = field(default_factory=RoutingPolicy)
+    screenshot_width: int = 1024
+    screenshot_format: str = "jpeg"  # png, jpeg or webp
+    screenshot_quality: int = 80
+    # product region crops sent to the vision model
+    region_screenshot_width: int = 768
+    max_region_tiles: int = 3
+
+
+CHROMIUM_LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--disable-web-security",  # May help with some CORS issues
+    "--disable-features=IsolateOrigins,site-per-process",  # May help with frame issues
+]
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
 EXTRACT_METADATA_SCRIPT = resources.read_text("core.browser.js", "extract_metadata.js")
 EXTRACT_HEADERS_SCRIPT = resources.read_text("core.browser.js", "extract_headers.js")
 EXTRACT_PRODUCT_INFO_SCRIPT = resources.read_text(
     "core.browser.js", "extract_product_info.js"
 )
+EXTRACT_PAGE_BUNDLE_SCRIPT = (
+    resources.read_text("core.browser.js", "extract_page_bundle.js")
+    .replace("__EXTRACT_PRODUCT_INFO__", EXTRACT_PRODUCT_INFO_SCRIPT)
+    .replace("__EXTRACT_HEADERS__", EXTRACT_HEADERS_SCRIPT)
+    .replace("__EXTRACT_METADATA__", EXTRACT_METADATA_SCRIPT)
+)
+DISTILL_PAGE_TEXT_SCRIPT = resources.read_text(
+    "core.browser.js", "distill_page_text.js"
+)
 
 
 class Browser:
-    def __init__(self, config: BrowserConfig):
+    def __init__(self, config: BrowserConfig, shared_browser: PlaywrightBrowser = None):
+        """
+        Args:
+            config: browser configuration
+            shared_browser: already launched chromium (e.g. leased from the
+                browser pool). When provided only an isolated context and page
+                are created and the browser process is left running on close.
+        """
         logger = Logger.get_logger(name="browser", level="DEBUG")
 
         logger.info(f"Initializing browser.")
         self.config = config
         self.logger = logger
         self.playwright = None
-        self.browser: PlaywrightBrowser = None
+        self.browser: PlaywrightBrowser = shared_browser
         self.page: Page = None
         self._cdp_session = None
-        self.context = None
-        self.screenshot_scale_factor = None
+        self.context: BrowserContext = None
+        self.request_stats = RequestStats()
+        # navigation timeouts and renderer crashes, read by the pool watchdog
+        self.error_count = 0
+        self._owns_browser = shared_browser is None
 
     async def __aenter__(self):
         """Initialize the browser and return the instance."""
@@ -59,33 +98,37 @@ class Browser:
 
     async def _init_browser(self):
         """Initialize the browser."""
-        self.playwright = await async_playwright().start()
-
-        # browser_context = getattr(self.playwright, self.config.browser_type)
-        self.browser = await self.playwright.chromium.launch(
-            headless=True,
-            args=[
-                "--disable-gpu",
-                "--disable-web-security",  # May help with some CORS issues
-                "--disable-features=IsolateOrigins,site-per-process",  # May help with frame issues
-            ],
-        )
+        if self._owns_browser:
+            self.playwright = await async_playwright().start()
+
+            # browser_context = getattr(self.playwright, self.config.browser_type)
+            self.browser = await self.playwright.chromium.launch(
+                headless=self.config.headless,
+                args=CHROMIUM_LAUNCH_ARGS,
+            )
 
         viewport_height, viewport_width = self.config.viewport_size
 
-        self.page = await self.browser.new_page(
+        # every browser gets its own context so cookies, storage and cache
+        # never leak between requests sharing the same chromium process
+        self.context = await self.browser.new_context(
             viewport={"width": viewport_width, "height": viewport_height},
             java_script_enabled=True,
             ignore_https_errors=self.config.ignoreHTTPSErrors,
         )
+        if self.config.routing_policy.enabled:
+            interceptor = RequestInterceptor(
+                self.config.routing_policy, self.request_stats
+            )
+            await self.context.route("**/*", interceptor.handle)
 
-        self.context = self.browser.contexts[0]
-        self._cdp_session = await self.browser.new_browser_cdp_session()
-        await self.page.set_extra_http_headers(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-        )
+        self.page = await self.context.new_page()
+        self.page.on("crash", self._on_page_crash)
+        await self.page.set_extra_http_headers({"User-Agent": USER_AGENT})
+
+    def _on_page_crash(self, page: Page):
+        self.error_count += 1
+        self.logger.error("Page crashed.")
 
     async def _close_browser(self):
         """Close the browser."""
@@ -93,9 +136,14 @@ class Browser:
             await self.page.close()
             self.page = None
 
-        if self.browser:
+        if self.context:
+            await self.context.close()
+            self.context = None
+            self.logger.info(f"Request stats: {self.request_stats.as_dict()}")
+
+        if self.browser and self._owns_browser:
             await self.browser.close()
-            self.browser = None
+        self.browser = None
 
         if self.playwright:
             await self.playwright.stop()
@@ -122,6 +170,7 @@ class Browser:
                 await asyncio.sleep(1.5)  # Wait for a second to allow the page to load
 
             except Exception as e:
+                self.error_count += 1
                 self.logger.error(f"Error navigating to {url}: {e}")
                 if attempt < max_retries - 1:
                     await asyncio.sleep(2**attempt)
@@ -176,6 +225,70 @@ class Browser:
             self.logger.error(f"Error extracting metadata: {e}")
             return None
 
+    async def extract_page_bundle(
+        self, primary_only: bool = True, profile: Optional[dict] = None
+    ):
+        """
+        Extract product info, headers and metadata in a single evaluate call.
+        Args:
+            primary_only: only serialize the main product of the page
+            profile: learned selectors (product, title, price, description)
+                tried before the generic selector lists
+        Returns:
+            dict with product_info, headers and metadata, or None on failure
+        """
+        self.logger.info("Extracting page bundle from the page.")
+
+        try:
+            bundle = await self.page.evaluate(
+                EXTRACT_PAGE_BUNDLE_SCRIPT,
+                {"primaryOnly": primary_only, "profile": profile or {}},
+            )
+        except Exception as e:
+            self.logger.error(f"Error extracting page bundle: {e}")
+            return None
+
+        metadata = bundle.get("metadata")
+        return {
+            "product_info": bundle.get("product_info"),
+            "headers": bundle.get("headers"),
+            "metadata": (
+                {
+                    "title": bundle.get("title"),
+                    "description": metadata.get("description", ""),
+                    "keywords": "",
+                    "metadata": metadata,
+                }
+                if metadata is not None
+                else None
+            ),
+        }
+
+    async def distill_page_text(
+        self, product_selector: Optional[str] = None, max_chars: int = 4000
+    ) -> Optional[str]:
+        """
+        Render the visible text of the product region as compact text.
+        Args:
+            product_selector: product container selector, e.g. learned for
+                the domain, main content is used when it does not match
+            max_chars: cap of the returned text
+        Returns:
+            headings, prices, bullets and paragraphs one per line, None on failure
+        """
+        self.logger.info("Distilling product text from the page.")
+
+        try:
+            distilled = await self.page.evaluate(
+                DISTILL_PAGE_TEXT_SCRIPT,
+                {"productSelector": product_selector, "maxChars": max_chars},
+            )
+        except Exception as e:
+            self.logger.error(f"Error distilling page text: {e}")
+            return None
+
+        return distilled.get("text") or None
+
     async def get_cdp_session(self):
         """Get or create cdp session"""
 
@@ -189,37 +302,106 @@ class Browser:
             self._cdp_session._page = self.page
         return self._cdp_session
 
-    async def get_screenshot(self):
-        """Returns base64 encoded screenshot of the current page"""
-
-        await self.page.wait_for_load_state("load") 
+    async def capture_screenshot(
+        self,
+        width: int = None,
+        image_format: str = None,
+        quality: int = None,
+        clip: dict = None,
+        as_image: bool = False,
+    ) -> Union[bytes, Image.Image, None]:
+        """
+        Capture the page (or a clip of it) already scaled to the target width.
+        Args:
+            width: output width in pixels, defaults to config.screenshot_width
+            image_format: png, jpeg or webp, defaults to config.screenshot_format
+            quality: jpeg/webp quality, defaults to config.screenshot_quality
+            clip: region {x, y, width, height} in CSS pixels, defaults to viewport
+            as_image: return a PIL image instead of the encoded bytes
+        Returns:
+            encoded image bytes or PIL image, None if capture failed
+        """
+
+        await self.page.wait_for_load_state("load")
+
+        width = width or self.config.screenshot_width
+        image_format = image_format or self.config.screenshot_format
+        quality = quality or self.config.screenshot_quality
+
+        viewport = self.page.viewport_size
+        region = clip or {
+            "x": 0,
+            "y": 0,
+            "width": viewport["width"],
+            "height": viewport["height"],
+        }
+        # chromium rasterizes straight at the target width, no resize pass
+        scale = min(1.0, width / region["width"])
 
-        cdp_session = await self.get_cdp_session()
         screenshot_params = {
-            "format": "png",
+            "format": image_format,
             "fromSurface": True,
-            "captureBeyondViewPort": False,
+            "captureBeyondViewport": clip is not None,
+            "clip": {**region, "scale": scale},
         }
+        if image_format != "png":
+            screenshot_params["quality"] = quality
+
         try:
+            cdp_session = await self.get_cdp_session()
             screenshot_data = await cdp_session.send(
                 "Page.captureScreenshot", screenshot_params
             )
-            screenshot_b64 = screenshot_data["data"]
+            image_bytes = base64.b64decode(screenshot_data["data"])
         except Exception as e:
             self.logger.warning(f"CDP screenshot failed: {e}, using Playwright API.")
-            try:
-                screenshot_bytes = await self.page.screenshot(type="png")
-                screenshot_b64 = base64.b64encode(screenshot_bytes).decode()
-            except Exception as e2:
-                self.logger.error(f"Playwright screenshot also failed: {e2}")
+            image_bytes = await self._playwright_screenshot(
+                region, scale, image_format, quality
+            )
+            if image_bytes is None:
                 return None
 
-        if self.screenshot_scale_factor is None:
-            test_img_data = base64.b64decode(screenshot_b64)
-            test_img = Image.open(io.BytesIO(test_img_data))
-            self.logger.info(f"Test image size: {test_img.size}")
-            self.screenshot_scale_factor = 1024 / test_img.size[0]
-            self.logger.info(f"Screenshot scale factor: {self.screenshot_scale_factor}")
+        if as_image:
+            return Image.open(io.BytesIO(image_bytes))
+        return image_bytes
+
+    async def _playwright_screenshot(
+        self, region: dict, scale: float, image_format: str, quality: int
+    ) -> Optional[bytes]:
+        """
+        Fallback capture; playwright cannot scale or encode webp, so the image
+        is resized and / or re-encoded once to match what CDP would return.
+        """
+        # playwright only encodes png and jpeg
+        pw_format = "png" if image_format == "png" else "jpeg"
+        try:
+            image_bytes = await self.page.screenshot(
+                type=pw_format,
+                quality=None if pw_format == "png" else quality,
+                clip=region,
+                full_page=True,
+            )
+        except Exception as e:
+            self.logger.error(f"Playwright screenshot also failed: {e}")
+            return None
+
+        if scale >= 1.0 and pw_format == image_format:
+            return image_bytes
 
-        screenshot_b64 = scale_b64_image(screenshot_b64, self.screenshot_scale_factor)
-        return screenshot_b64
+        image = Image.open(io.BytesIO(image_bytes))
+        if scale < 1.0:
+            image = image.resize(
+                (int(image.width * scale), int(image.height * scale)), Image.LANCZOS
+            )
+        buffer = io.BytesIO()
+        save_params = {} if image_format == "png" else {"quality": quality}
+        image.save(buffer, format=image_format.upper(), **save_params)
+        return buffer.getvalue()
+
+    async def get_screenshot(self):
+        """Returns base64 encoded png screenshot of the current page"""
+
+        screenshot_bytes = await self.capture_screenshot(image_format="png")
+        if screenshot_bytes is None:
+            return None
+        return base64.b64encode(screenshot_bytes).decode()
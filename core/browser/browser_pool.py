@@ -0,0 +1,331 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List, Optional
+from playwright.async_api import (
+    async_playwright,
+    Browser as PlaywrightBrowser,
+    Playwright,
+)
+
+from config.env_variables import Settings, get_settings
+from core.browser.browser import Browser, BrowserConfig, CHROMIUM_LAUNCH_ARGS
+from core.utils.logger import Logger
+from exceptions.browser_pool_exhausted_error import BrowserPoolExhaustedError
+
+
+@dataclass
+class BrowserPoolConfig:
+    pool_size: int = 2
+    max_concurrency: int = 8
+    lease_timeout: float = 30.0
+    max_queue: int = 32
+    headless: bool = True
+
+    # recycling thresholds, 0 disables a threshold
+    max_pages_per_browser: int = 200
+    max_rss_mb: int = 1536
+    max_errors_per_browser: int = 10
+    max_browser_age: float = 6 * 60 * 60
+    watchdog_interval: float = 30.0
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "BrowserPoolConfig":
+        return cls(
+            pool_size=settings.BROWSER_POOL_SIZE,
+            max_concurrency=settings.BROWSER_POOL_MAX_CONCURRENCY,
+            lease_timeout=settings.BROWSER_POOL_LEASE_TIMEOUT,
+            max_queue=settings.BROWSER_POOL_MAX_QUEUE,
+            max_pages_per_browser=settings.BROWSER_RECYCLE_MAX_PAGES,
+            max_rss_mb=settings.BROWSER_RECYCLE_MAX_RSS_MB,
+            max_errors_per_browser=settings.BROWSER_RECYCLE_MAX_ERRORS,
+            max_browser_age=settings.BROWSER_RECYCLE_MAX_AGE,
+            watchdog_interval=settings.BROWSER_WATCHDOG_INTERVAL,
+        )
+
+
+@dataclass
+class PooledBrowser:
+    """Chromium process owned by the pool and its health bookkeeping"""
+
+    browser: PlaywrightBrowser
+    active_leases: int = 0
+    pages_served: int = 0
+    error_count: int = 0
+    rss_bytes: int = 0
+    launched_at: float = field(default_factory=time.monotonic)
+    draining: bool = False
+    crashed: bool = False
+
+
+def _process_rss_bytes(pid: int) -> int:
+    """Resident set size of a process from /proc, 0 where unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+class BrowserPool:
+    """
+    Process-wide pool of pre-launched chromium browsers.
+
+    Each lease gets an isolated browser context on one of the warm chromium
+    processes, so a request only pays for navigation and extraction.
+
+    A watchdog recycles browsers that served too many pages, grew past the
+    RSS limit, hit too many errors or got too old: a replacement is launched
+    right away and the old process is closed once its in-flight leases end.
+    """
+
+    def __init__(self, config: BrowserPoolConfig):
+        self.config = config
+        self.logger = Logger.get_logger(name="browser_pool")
+        self._playwright: Optional[Playwright] = None
+        self._browsers: List[PooledBrowser] = []
+        self._draining_browsers: List[PooledBrowser] = []
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+        self._start_lock = asyncio.Lock()
+        self._recycle_lock = asyncio.Lock()
+        self._watchdog: Optional[asyncio.Task] = None
+        self._waiting = 0
+        self._recycled = 0
+        self._started = False
+
+    async def start(self):
+        """Start playwright, launch the configured browsers and the watchdog."""
+        async with self._start_lock:
+            if self._started:
+                return
+
+            self.logger.info(
+                f"Starting browser pool with {self.config.pool_size} browsers."
+            )
+            self._playwright = await async_playwright().start()
+            self._browsers = await asyncio.gather(
+                *[self._launch() for _ in range(self.config.pool_size)]
+            )
+            if self.config.watchdog_interval > 0:
+                self._watchdog = asyncio.create_task(self._run_watchdog())
+            self._started = True
+
+    async def stop(self):
+        """Close every pooled browser and stop playwright."""
+        async with self._start_lock:
+            if not self._started:
+                return
+
+            if self._watchdog:
+                self._watchdog.cancel()
+                self._watchdog = None
+
+            for pooled in self._browsers + self._draining_browsers:
+                await self._close(pooled)
+            self._browsers = []
+            self._draining_browsers = []
+
+            await self._playwright.stop()
+            self._playwright = None
+            self._started = False
+            self.logger.info("Browser pool stopped.")
+
+    async def _launch(self) -> PooledBrowser:
+        browser = await self._playwright.chromium.launch(
+            headless=self.config.headless,
+            args=CHROMIUM_LAUNCH_ARGS,
+        )
+        pooled = PooledBrowser(browser=browser)
+
+        def on_disconnected(_):
+            pooled.crashed = True
+
+        browser.on("disconnected", on_disconnected)
+        return pooled
+
+    async def _close(self, pooled: PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            self.logger.error(f"Error closing pooled browser: {e}")
+
+    def _recycle_reason(self, pooled: PooledBrowser) -> Optional[str]:
+        config = self.config
+        if pooled.crashed or not pooled.browser.is_connected():
+            return "disconnected"
+        if config.max_pages_per_browser and (
+            pooled.pages_served >= config.max_pages_per_browser
+        ):
+            return f"served {pooled.pages_served} pages"
+        if config.max_rss_mb and pooled.rss_bytes >= config.max_rss_mb * 1024**2:
+            return f"rss {pooled.rss_bytes // 1024**2}MB"
+        if config.max_errors_per_browser and (
+            pooled.error_count >= config.max_errors_per_browser
+        ):
+            return f"{pooled.error_count} errors"
+        if config.max_browser_age and (
+            time.monotonic() - pooled.launched_at >= config.max_browser_age
+        ):
+            return "max age reached"
+        return None
+
+    async def _recycle(self, pooled: PooledBrowser, reason: str):
+        """Swap a browser for a fresh one without failing its in-flight leases."""
+        async with self._recycle_lock:
+            if pooled.draining or pooled not in self._browsers:
+                return
+
+            self.logger.info(f"Recycling pooled browser: {reason}.")
+            try:
+                replacement = await self._launch()
+            except Exception as e:
+                self.logger.error(f"Failed to launch replacement browser: {e}")
+                return
+
+            pooled.draining = True
+            self._browsers[self._browsers.index(pooled)] = replacement
+            self._draining_browsers.append(pooled)
+            self._recycled += 1
+
+        if pooled.active_leases == 0:
+            await self._retire(pooled)
+
+    async def _retire(self, pooled: PooledBrowser):
+        if pooled in self._draining_browsers:
+            self._draining_browsers.remove(pooled)
+            await self._close(pooled)
+
+    async def _sample_rss(self, pooled: PooledBrowser):
+        """Sum the RSS of the browser and its renderer/gpu processes."""
+        try:
+            cdp_session = await pooled.browser.new_browser_cdp_session()
+            try:
+                info = await cdp_session.send("SystemInfo.getProcessInfo")
+            finally:
+                await cdp_session.detach()
+        except Exception as e:
+            self.logger.warning(f"Failed to read browser process info: {e}")
+            return
+
+        pooled.rss_bytes = sum(
+            _process_rss_bytes(process["id"]) for process in info["processInfo"]
+        )
+
+    async def _run_watchdog(self):
+        while True:
+            await asyncio.sleep(self.config.watchdog_interval)
+            for pooled in list(self._browsers):
+                try:
+                    if not pooled.crashed:
+                        await self._sample_rss(pooled)
+                    reason = self._recycle_reason(pooled)
+                    if reason:
+                        await self._recycle(pooled, reason)
+                except Exception as e:
+                    self.logger.error(f"Browser watchdog error: {e}")
+
+    def _pick_browser(self) -> PooledBrowser:
+        """Returns the least busy healthy browser."""
+        healthy = [p for p in self._browsers if not p.crashed] or self._browsers
+        return min(healthy, key=lambda pooled: pooled.active_leases)
+
+    async def _acquire_slot(self):
+        if self._semaphore.locked() and self._waiting >= self.config.max_queue:
+            raise BrowserPoolExhaustedError(
+                f"{self._waiting} requests already waiting for a browser"
+            )
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(), timeout=self.config.lease_timeout
+            )
+        except asyncio.TimeoutError:
+            raise BrowserPoolExhaustedError(
+                f"no browser available after {self.config.lease_timeout}s"
+            )
+        finally:
+            self._waiting -= 1
+
+    @asynccontextmanager
+    async def lease(self, config: BrowserConfig = None) -> AsyncIterator[Browser]:
+        """
+        Lease a browser with a fresh context and page.
+        Args:
+            config: per request browser config (viewport, timeouts)
+        Returns:
+            Browser bound to a pooled chromium process
+        """
+        if not self._started:
+            await self.start()
+
+        await self._acquire_slot()
+        try:
+            pooled = self._pick_browser()
+            if pooled.crashed:
+                await self._recycle(pooled, "disconnected")
+                pooled = self._pick_browser()
+
+            pooled.active_leases += 1
+            browser = Browser(
+                config=config or BrowserConfig(), shared_browser=pooled.browser
+            )
+            try:
+                async with browser:
+                    yield browser
+            finally:
+                pooled.active_leases -= 1
+                pooled.pages_served += 1
+                pooled.error_count += browser.error_count
+                await self._release(pooled)
+        finally:
+            self._semaphore.release()
+
+    async def _release(self, pooled: PooledBrowser):
+        if pooled.draining:
+            if pooled.active_leases == 0:
+                await self._retire(pooled)
+            return
+
+        reason = self._recycle_reason(pooled)
+        if reason:
+            await self._recycle(pooled, reason)
+
+    def stats(self) -> dict:
+        return {
+            "browsers": len(self._browsers),
+            "draining": len(self._draining_browsers),
+            "recycled": self._recycled,
+            "active_leases": sum(
+                p.active_leases for p in self._browsers + self._draining_browsers
+            ),
+            "waiting": self._waiting,
+            "instances": [
+                {
+                    "pages_served": p.pages_served,
+                    "active_leases": p.active_leases,
+                    "errors": p.error_count,
+                    "rss_mb": round(p.rss_bytes / 1024**2, 1),
+                    "age_seconds": round(time.monotonic() - p.launched_at),
+                }
+                for p in self._browsers
+            ],
+        }
+
+
+_browser_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Get the process-wide browser pool.
+    """
+    global _browser_pool
+
+    if _browser_pool is None:
+        _browser_pool = BrowserPool(BrowserPoolConfig.from_settings(get_settings()))
+    return _browser_pool
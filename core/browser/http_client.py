@@ -0,0 +1,36 @@
+from typing import Optional
+import httpx
+
+from config.env_variables import get_settings
+from core.browser.browser import USER_AGENT
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the process-wide pooled http client used for lightweight page fetches.
+    """
+    global _http_client
+
+    if _http_client is None:
+        settings = get_settings()
+        _http_client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(settings.HTTP_FETCH_TIMEOUT),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+            },
+        )
+    return _http_client
+
+
+async def close_http_client():
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
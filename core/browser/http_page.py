@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Dict, Optional
+import httpx
+
+from core.browser.http_client import get_http_client
+from core.browser.structured_data import parse_page_html, product_from_structured_data
+from core.utils.logger import Logger
+
+# product info fields that must come from structured data to skip the browser
+REQUIRED_FAST_PATH_FIELDS = ("title", "price", "images")
+
+
+def _parse_bundle(html: str, url: str) -> Dict[str, Any]:
+    page = parse_page_html(html, url)
+    metadata = page["metadata"]
+
+    return {
+        "product_info": [product_from_structured_data(metadata, url)],
+        "headers": page["headers"],
+        "metadata": {
+            "title": page["title"],
+            "description": metadata.get("description") or "",
+            "keywords": "",
+            "metadata": metadata,
+        },
+    }
+
+
+def has_required_fields(product_info: Dict[str, Any]) -> bool:
+    return all(product_info.get(key) for key in REQUIRED_FAST_PATH_FIELDS)
+
+
+async def fetch_page_bundle(url: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch raw html without a browser and read JSON-LD, OpenGraph and meta tags.
+    Args:
+        url: product page url
+    Returns:
+        bundle shaped like Browser.extract_page_bundle, None if the page could
+        not be fetched as html
+    """
+    logger = Logger.get_logger(__name__)
+
+    try:
+        response = await get_http_client().get(url)
+    except httpx.HTTPError as e:
+        logger.warning(f"HTTP fetch failed for {url}: {e}")
+        return None
+
+    content_type = response.headers.get("content-type", "")
+    if response.status_code >= 400 or "html" not in content_type:
+        logger.info(
+            f"HTTP fetch of {url} unusable ({response.status_code}, {content_type})"
+        )
+        return None
+
+    # html parsing is CPU bound, keep it off the event loop
+    return await asyncio.to_thread(_parse_bundle, response.text, str(response.url))
@@ -0,0 +1,98 @@
+(options = {}) => {
+  // Compact text rendering of the product region for the text-only model:
+  // headings, prices, bullet features and short paragraphs, capped in length.
+  const maxChars = options.maxChars || 4000;
+  const priceLike = /[$€£₹]\s?\d|\d+[.,]\d{2}/;
+  const skippedTags = new Set([
+    "SCRIPT",
+    "STYLE",
+    "NOSCRIPT",
+    "TEMPLATE",
+    "SVG",
+    "IFRAME",
+    "NAV",
+    "FOOTER",
+    "HEADER",
+    "ASIDE",
+    "FORM",
+  ]);
+
+  const findRoot = () => {
+    if (options.productSelector) {
+      try {
+        const el = document.querySelector(options.productSelector);
+        if (el) return el;
+      } catch (e) {
+        // learned selectors come from storage, ignore a broken one
+      }
+    }
+    return (
+      document.querySelector("[itemtype*='schema.org/Product']") ||
+      document.querySelector("main, [role='main'], #main") ||
+      document.body
+    );
+  };
+
+  const isHidden = (el) => {
+    if (el.hidden || el.getAttribute("aria-hidden") === "true") return true;
+    const style = window.getComputedStyle(el);
+    return style.display === "none" || style.visibility === "hidden";
+  };
+
+  const lines = [];
+  let length = 0;
+  let truncated = false;
+
+  const push = (line) => {
+    line = line.replace(/\s+/g, " ").trim();
+    if (!line || lines[lines.length - 1] === line) return;
+    if (length + line.length > maxChars) {
+      truncated = true;
+      return;
+    }
+    lines.push(line);
+    length += line.length + 1;
+  };
+
+  const blockPrefix = (el) => {
+    if (/^H[1-6]$/.test(el.tagName)) return "#".repeat(+el.tagName[1]) + " ";
+    if (el.tagName === "LI") return "- ";
+    return "";
+  };
+
+  // block level elements become one line each, their inline text joined
+  const blockTags = /^(H[1-6]|LI|P|DT|DD|TD|TH|TR|BUTTON|LABEL|OPTION|SUMMARY)$/;
+
+  const walk = (el) => {
+    if (truncated || skippedTags.has(el.tagName) || isHidden(el)) return;
+
+    if (blockTags.test(el.tagName)) {
+      const text = el.innerText || el.textContent || "";
+      if (text.trim().length <= 400 || !el.children.length) {
+        const prefix = priceLike.test(text) && !blockPrefix(el) ? "price: " : "";
+        push(blockPrefix(el) + prefix + text.slice(0, 400));
+        return;
+      }
+    }
+
+    for (const child of el.childNodes) {
+      if (child.nodeType === Node.ELEMENT_NODE) {
+        walk(child);
+      } else if (child.nodeType === Node.TEXT_NODE) {
+        const text = child.nodeValue.trim();
+        if (text.length > 1) {
+          push((priceLike.test(text) && text.length < 40 ? "price: " : "") + text);
+        }
+      }
+    }
+  };
+
+  const root = findRoot();
+  const h1 = document.querySelector("h1");
+  if (h1 && !root.contains(h1)) {
+    push("# " + h1.textContent);
+  }
+  walk(root);
+
+  return { text: lines.join("\n"), truncated };
+}
@@ -7,6 +7,7 @@
     canonical: document.querySelector('link[rel="canonical"]')?.href || null,
     og_tags: {},
     twitter_tags: {},
+    product_tags: {},
     schema_org: null,
   };
 
@@ -17,6 +18,13 @@
     metadata.og_tags[property] = tag.content;
   });
 
+  // Extract OpenGraph product tags (product:price:amount, ...)
+  const productTags = document.querySelectorAll('meta[property^="product:"]');
+  productTags.forEach((tag) => {
+    const property = tag.getAttribute("property").substring(8);
+    metadata.product_tags[property] = tag.content;
+  });
+
   // Extract Twitter tags
   const twitterTags = document.querySelectorAll('meta[name^="twitter:"]');
   twitterTags.forEach((tag) => {
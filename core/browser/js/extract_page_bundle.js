@@ -0,0 +1,22 @@
+(options = {}) => {
+  // Placeholders are replaced with the single purpose extraction scripts when
+  // the bundle is loaded, so the whole page is read in one evaluate call.
+  const extractProductInfo = __EXTRACT_PRODUCT_INFO__;
+  const extractHeaders = __EXTRACT_HEADERS__;
+  const extractMetadata = __EXTRACT_METADATA__;
+
+  const safely = (extract) => {
+    try {
+      return extract();
+    } catch (e) {
+      return null;
+    }
+  };
+
+  return {
+    title: document.title,
+    product_info: safely(() => extractProductInfo(options)),
+    headers: safely(extractHeaders),
+    metadata: safely(extractMetadata),
+  };
+}
@@ -1,4 +1,44 @@
-() => {
+(options = {}) => {
+  // primaryOnly: only the first (main) product of the page is serialized
+  const maxProducts = options.primaryOnly ? 1 : 20;
+  const currencyChars = /[$€₹]/;
+  const priceLike = /[$€₹]|\d+[.,]\d{2}/;
+
+  // profile: selectors that matched on earlier visits of this domain, tried
+  // before the generic lists so repeat-domain pages skip the search
+  const profile = options.profile || {};
+  const withPreferred = (preferred, selectors) =>
+    preferred
+      ? [preferred, ...selectors.filter((selector) => selector !== preferred)]
+      : selectors;
+
+  // learned selectors come from storage, never let a bad one break extraction
+  const safeQueryAll = (root, selector) => {
+    try {
+      return root.querySelectorAll(selector);
+    } catch (e) {
+      return [];
+    }
+  };
+  const safeQuery = (root, selector) => {
+    try {
+      return root.querySelector(selector);
+    } catch (e) {
+      return null;
+    }
+  };
+
+  // element box in document coordinates, used to screenshot only the product
+  const documentBox = (el) => {
+    const rect = el.getBoundingClientRect();
+    return {
+      x: rect.left + window.scrollX,
+      y: rect.top + window.scrollY,
+      width: rect.width,
+      height: rect.height,
+    };
+  };
+
   // Common product container selectors
   const productSelectors = [
     ".product",
@@ -14,40 +54,96 @@
     "[class*='imageContainer']",
   ];
 
+  // Finds the closest containers holding both an image and a price-like text.
+  // Image ancestors are marked once (stopping at already marked nodes) and
+  // every text node is visited once, so the cost stays linear in DOM size.
+  const findProductsByStructure = (limit) => {
+    const imageAncestors = new Set();
+    for (const img of document.images) {
+      let node = img.parentElement;
+      while (node && !imageAncestors.has(node)) {
+        imageAncestors.add(node);
+        node = node.parentElement;
+      }
+    }
+
+    const found = [];
+    const seen = new Set();
+    const walker = document.createTreeWalker(
+      document.body,
+      NodeFilter.SHOW_TEXT
+    );
+    let textNode;
+    while (found.length < limit && (textNode = walker.nextNode())) {
+      const text = textNode.nodeValue;
+      if (!text || text.length > 200 || !priceLike.test(text)) {
+        continue;
+      }
+
+      let container = textNode.parentElement;
+      while (container && !imageAncestors.has(container)) {
+        container = container.parentElement;
+      }
+      if (
+        container &&
+        container !== document.body &&
+        container !== document.documentElement &&
+        !seen.has(container)
+      ) {
+        seen.add(container);
+        found.push(container);
+      }
+    }
+    return found;
+  };
+
+  // First short text inside root that carries a currency symbol
+  const findPriceText = (root) => {
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+    let textNode;
+    while ((textNode = walker.nextNode())) {
+      if (!currencyChars.test(textNode.nodeValue)) {
+        continue;
+      }
+      // prices are often split in spans ("₹" + "999"), prefer the parent text
+      const parentText = textNode.parentElement?.textContent.trim() || "";
+      const text =
+        parentText.length < 200 ? parentText : textNode.nodeValue.trim();
+      if (text && text.length < 200) {
+        return text;
+      }
+    }
+    return "";
+  };
+
   let productElements = [];
+  let productSelector = null;
 
   // Try each selector until we find products
-  for (const selector of productSelectors) {
-    const elements = document.querySelectorAll(selector);
+  for (const selector of withPreferred(profile.product, productSelectors)) {
+    const elements = safeQueryAll(document, selector);
     if (elements.length > 0) {
       productElements = Array.from(elements);
+      productSelector = selector;
       break;
     }
   }
 
   // If no products found with common selectors, try to find by structure
   if (productElements.length === 0) {
-    // Look for elements with images and prices (common product structure)
-    const potentialProducts = document.querySelectorAll("*");
-    for (const el of potentialProducts) {
-      const priceEl =
-        el.textContent.includes("$") ||
-        el.textContent.includes("€") ||
-        el.textContent.includes("₹");
-
-      if (
-        el.querySelector("img") &&
-        (el.textContent.match(/\\d+\\.\\d{2}/) ||
-          priceEl ||
-          el.querySelector(".price"))
-      ) {
-        productElements.push(el);
-      }
-    }
+    productElements = findProductsByStructure(maxProducts);
   }
 
   // Process products with enhanced metadata
-  return productElements.slice(0, 20).map((productEl, index) => {
+  return productElements.slice(0, maxProducts).map((productEl, index) => {
+    // selectors that produced each field, learned per domain
+    const matchedSelectors = {
+      product: productSelector,
+      title: null,
+      price: null,
+      description: null,
+    };
+
     // Extract product images
     const imgElements = productEl.querySelectorAll("img");
     const images = Array.from(imgElements)
@@ -64,6 +160,14 @@
         (img) => img.url && !img.url.includes("placeholder") && img.width > 50
       );
 
+    // the largest product images, captured on their own if the container is
+    // too big to be a useful crop
+    const imageBoxes = Array.from(imgElements)
+      .filter((img) => img.width > 50 && img.height > 50)
+      .sort((a, b) => b.width * b.height - a.width * a.height)
+      .slice(0, 3)
+      .map(documentBox);
+
     // Extract product title
     let title = "";
     const titleSelectors = [
@@ -79,10 +183,11 @@
       "[itemprop='name']",
     ];
 
-    for (const selector of titleSelectors) {
-      const titleEl = productEl.querySelector(selector);
+    for (const selector of withPreferred(profile.title, titleSelectors)) {
+      const titleEl = safeQuery(productEl, selector);
       if (titleEl) {
         title = titleEl.textContent.trim();
+        matchedSelectors.title = selector;
         break;
       }
     }
@@ -101,32 +206,17 @@
       "[itemprop='price']",
     ];
 
-    for (const selector of priceSelectors) {
-      const priceEl = productEl.querySelector(selector);
+    for (const selector of withPreferred(profile.price, priceSelectors)) {
+      const priceEl = safeQuery(productEl, selector);
       if (priceEl) {
         price = priceEl.textContent.trim();
+        matchedSelectors.price = selector;
         break;
       }
     }
 
     if (!price) {
-      const potentialProducts = productEl.querySelectorAll("*");
-      for (const el of potentialProducts) {
-        const priceEl =
-          el.textContent.includes("$") ||
-          el.textContent.includes("€") ||
-          el.textContent.includes("₹");
-
-        if (priceEl) {
-          // Extract the element text content
-          const textContent = el.textContent.trim();
-
-          // Only add non-empty and reasonable length texts
-          if (textContent && textContent.length < 200) {
-            price = textContent;
-          }
-        }
-      }
+      price = findPriceText(productEl);
     }
 
     // Check for sale price
@@ -155,10 +245,11 @@
       "[class*='Description']",
     ];
 
-    for (const selector of descSelectors) {
-      const descEl = productEl.querySelector(selector);
+    for (const selector of withPreferred(profile.description, descSelectors)) {
+      const descEl = safeQuery(productEl, selector);
       if (descEl) {
         description = descEl.textContent.trim();
+        matchedSelectors.description = selector;
         break;
       }
     }
@@ -278,6 +369,15 @@
       variants: variants.length > 0 ? variants : null,
       images: images.map((img) => img.url),
       url: url ? url : null,
+      matched_selectors: matchedSelectors,
+      regions: {
+        product: documentBox(productEl),
+        images: imageBoxes,
+        page: {
+          width: document.documentElement.scrollWidth,
+          height: document.documentElement.scrollHeight,
+        },
+      },
     };
   });
 }
\ No newline at end of file
@@ -0,0 +1,184 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+from playwright.async_api import Request, Route
+
+# Resources never needed for extraction or the product screenshot
+DEFAULT_BLOCKED_RESOURCE_TYPES = {
+    "font",
+    "media",
+    "websocket",
+    "eventsource",
+    "manifest",
+    "texttrack",
+}
+
+# Ads, analytics and tracking pixels commonly embedded on retailer pages
+DEFAULT_BLOCKED_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "googlesyndication.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.net",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "hotjar.com",
+    "clarity.ms",
+    "bat.bing.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "segment.io",
+    "newrelic.com",
+    "nr-data.net",
+    "optimizely.com",
+    "mixpanel.com",
+    "tiktok.com",
+    "snap.licdn.com",
+]
+
+
+# rough transfer size per resource type, used to estimate what a block saved
+# since aborted requests never see their response
+AVERAGE_RESOURCE_BYTES = {
+    "font": 30_000,
+    "media": 500_000,
+    "image": 15_000,
+    "script": 25_000,
+    "stylesheet": 10_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "manifest": 1_000,
+    "texttrack": 2_000,
+}
+DEFAULT_RESOURCE_BYTES = 2_000
+
+
+@dataclass
+class RoutingPolicy:
+    """
+    Request routing rules applied to every page of a browser context.
+
+    Size limits need the response to be fetched through playwright before it
+    is handed to chromium, so they only save chromium memory and decode time,
+    not bandwidth; they are disabled by default.
+    """
+
+    enabled: bool = True
+    blocked_resource_types: Set[str] = field(
+        default_factory=lambda: set(DEFAULT_BLOCKED_RESOURCE_TYPES)
+    )
+    blocked_domains: List[str] = field(
+        default_factory=lambda: list(DEFAULT_BLOCKED_DOMAINS)
+    )
+    max_resource_bytes: Optional[int] = None
+    size_checked_resource_types: Set[str] = field(default_factory=lambda: {"image"})
+
+
+@dataclass
+class RequestStats:
+    """
+    Per-request counters of routed requests.
+
+    `size_blocked_bytes` is the exact size of responses blocked by the size
+    limit, `estimated_blocked_bytes` adds AVERAGE_RESOURCE_BYTES for requests
+    blocked by type or domain, which are aborted before any response exists.
+    """
+
+    allowed_requests: int = 0
+    blocked_requests: int = 0
+    size_blocked_bytes: int = 0
+    estimated_blocked_bytes: int = 0
+    blocked_by_reason: Dict[str, int] = field(default_factory=dict)
+
+    def record_blocked(
+        self, reason: str, resource_type: str = "", size: Optional[int] = None
+    ):
+        self.blocked_requests += 1
+        if size is None:
+            size = AVERAGE_RESOURCE_BYTES.get(resource_type, DEFAULT_RESOURCE_BYTES)
+        else:
+            self.size_blocked_bytes += size
+        self.estimated_blocked_bytes += size
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+
+    def as_dict(self) -> dict:
+        return {
+            "allowed_requests": self.allowed_requests,
+            "blocked_requests": self.blocked_requests,
+            "size_blocked_bytes": self.size_blocked_bytes,
+            "estimated_blocked_bytes": self.estimated_blocked_bytes,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+        }
+
+
+def _is_blocked_domain(host: str, blocked_domains: List[str]) -> bool:
+    return any(host == d or host.endswith(f".{d}") for d in blocked_domains)
+
+
+class RequestInterceptor:
+    """Applies a RoutingPolicy to playwright routes and records RequestStats"""
+
+    def __init__(self, policy: RoutingPolicy, stats: RequestStats):
+        self.policy = policy
+        self.stats = stats
+
+    def block_reason(self, request: Request) -> Optional[str]:
+        """Returns why the request should be blocked, None if it is allowed."""
+        if request.is_navigation_request():
+            return None
+
+        if request.resource_type in self.policy.blocked_resource_types:
+            return f"type:{request.resource_type}"
+
+        host = urlparse(request.url).hostname or ""
+        if _is_blocked_domain(host, self.policy.blocked_domains):
+            return "domain"
+
+        return None
+
+    async def handle(self, route: Route):
+        request = route.request
+        reason = self.block_reason(request)
+
+        if reason:
+            self.stats.record_blocked(reason, request.resource_type)
+            await route.abort("blockedbyclient")
+            return
+
+        if (
+            self.policy.max_resource_bytes
+            and request.resource_type in self.policy.size_checked_resource_types
+        ):
+            await self._handle_size_limited(route)
+            return
+
+        self.stats.allowed_requests += 1
+        await route.continue_()
+
+    async def _handle_size_limited(self, route: Route):
+        try:
+            response = await route.fetch()
+        except Exception:
+            await route.abort()
+            return
+
+        content_length = response.headers.get("content-length")
+        size = (
+            int(content_length) if content_length and content_length.isdigit() else None
+        )
+        if size is None:
+            size = len(await response.body())
+
+        if size > self.policy.max_resource_bytes:
+            self.stats.record_blocked("size", route.request.resource_type, size)
+            await route.abort("blockedbyclient")
+            return
+
+        self.stats.allowed_requests += 1
+        await route.fulfill(response=response)
@@ -0,0 +1,80 @@
+import math
+from typing import Any, Dict, List, Optional
+
+# boxes smaller than this are icons or collapsed elements, not a product
+MIN_REGION_SIZE = 100
+# a "product" covering most of the page is a layout wrapper, not a crop
+MAX_PAGE_COVERAGE = 0.6
+REGION_PADDING = 16
+
+
+def _valid(box: Optional[Dict[str, float]]) -> bool:
+    return bool(
+        box
+        and box.get("width", 0) >= MIN_REGION_SIZE
+        and box.get("height", 0) >= MIN_REGION_SIZE
+    )
+
+
+def _union(boxes: List[Dict[str, float]]) -> Dict[str, float]:
+    left = min(box["x"] for box in boxes)
+    top = min(box["y"] for box in boxes)
+    right = max(box["x"] + box["width"] for box in boxes)
+    bottom = max(box["y"] + box["height"] for box in boxes)
+    return {"x": left, "y": top, "width": right - left, "height": bottom - top}
+
+
+def _pad_and_clamp(box: Dict[str, float], page: Dict[str, float]) -> Dict[str, float]:
+    left = max(0.0, box["x"] - REGION_PADDING)
+    top = max(0.0, box["y"] - REGION_PADDING)
+    right = min(page["width"], box["x"] + box["width"] + REGION_PADDING)
+    bottom = min(page["height"], box["y"] + box["height"] + REGION_PADDING)
+    return {"x": left, "y": top, "width": right - left, "height": bottom - top}
+
+
+def product_screenshot_clips(
+    regions: Dict[str, Any], max_tiles: int = 3, tile_aspect: float = 1.5
+) -> List[Dict[str, float]]:
+    """
+    Turn the product boxes reported by extract_product_info.js into
+    screenshot clips.
+    Args:
+        regions: {product, images, page} boxes in document coordinates
+        max_tiles: tall regions are split into at most this many tiles
+        tile_aspect: maximum height / width ratio of a single tile
+    Returns:
+        clips {x, y, width, height} top to bottom, empty when the page has
+        no usable product region and the viewport should be captured instead
+    """
+    page = regions.get("page") or {}
+    if not page.get("width") or not page.get("height"):
+        return []
+
+    box = regions.get("product")
+    page_area = page["width"] * page["height"]
+    if not _valid(box) or box["width"] * box["height"] > page_area * MAX_PAGE_COVERAGE:
+        images = [image for image in regions.get("images") or [] if _valid(image)]
+        if not images:
+            return []
+        box = _union(images)
+
+    region = _pad_and_clamp(box, page)
+    if region["width"] <= 0 or region["height"] <= 0:
+        return []
+
+    # the top of a product block carries the image, title and price, so a
+    # very tall block keeps only its first tiles
+    tile_height = region["width"] * tile_aspect
+    tiles = min(max_tiles, math.ceil(region["height"] / tile_height))
+    if tiles <= 1:
+        return [region]
+
+    return [
+        {
+            "x": region["x"],
+            "y": region["y"] + i * tile_height,
+            "width": region["width"],
+            "height": min(tile_height, region["height"] - i * tile_height),
+        }
+        for i in range(tiles)
+    ]
@@ -0,0 +1,270 @@
+import json
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin
+
+HEADER_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+AVAILABILITY_MAP = {
+    "instock": "in_stock",
+    "onlineonly": "in_stock",
+    "limitedavailability": "in_stock",
+    "outofstock": "out_of_stock",
+    "soldout": "out_of_stock",
+    "discontinued": "out_of_stock",
+    "preorder": "preorder",
+    "presale": "preorder",
+    "backorder": "preorder",
+}
+
+
+class _PageDataParser(HTMLParser):
+    """Collects the same page data as extract_metadata.js / extract_headers.js"""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.title = ""
+        self.headers: Dict[str, str] = {}
+        self.meta: Dict[str, Optional[str]] = {
+            "description": None,
+            "keywords": None,
+            "author": None,
+        }
+        self.canonical: Optional[str] = None
+        self.og_tags: Dict[str, str] = {}
+        self.twitter_tags: Dict[str, str] = {}
+        self.product_tags: Dict[str, str] = {}
+        self.schema_org: List[Any] = []
+
+        self._capture: Optional[str] = None
+        self._buffer: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+
+        if tag == "meta":
+            self._handle_meta(attrs)
+        elif tag == "link" and "canonical" in (attrs.get("rel") or "").split():
+            if attrs.get("href"):
+                self.canonical = urljoin(self.base_url, attrs["href"])
+        elif tag == "title" or tag in HEADER_TAGS:
+            self._start_capture(tag)
+        elif tag == "script" and (attrs.get("type") or "").strip() == (
+            "application/ld+json"
+        ):
+            self._start_capture("ld+json")
+
+    def handle_endtag(self, tag):
+        if self._capture is None:
+            return
+        if tag == self._capture or (tag == "script" and self._capture == "ld+json"):
+            self._end_capture()
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._buffer.append(data)
+
+    def _start_capture(self, name: str):
+        self._capture = name
+        self._buffer = []
+
+    def _end_capture(self):
+        text = "".join(self._buffer)
+        if self._capture == "title":
+            self.title = self.title or text.strip()
+        elif self._capture == "ld+json":
+            try:
+                self.schema_org.append(json.loads(text))
+            except ValueError:
+                # Skip invalid JSON
+                pass
+        else:
+            self.headers[self._capture.upper()] = " ".join(text.split())
+
+        self._capture = None
+        self._buffer = []
+
+    def _handle_meta(self, attrs: Dict[str, str]):
+        content = attrs.get("content")
+        if content is None:
+            return
+
+        name = (attrs.get("name") or "").lower()
+        prop = (attrs.get("property") or "").lower()
+
+        if name in self.meta:
+            self.meta[name] = content
+        elif name.startswith("twitter:"):
+            self.twitter_tags[name[8:]] = content
+
+        if prop.startswith("og:"):
+            self.og_tags[prop[3:]] = content
+        elif prop.startswith("product:"):
+            self.product_tags[prop[8:]] = content
+
+
+def parse_page_html(html: str, base_url: str) -> Dict[str, Any]:
+    """
+    Parse raw html into the headers/metadata shape produced by the browser.
+    Args:
+        html: page html
+        base_url: url the html was fetched from, used for relative links
+    Returns:
+        dict with title, headers and metadata
+    """
+    parser = _PageDataParser(base_url)
+    parser.feed(html)
+    parser.close()
+
+    return {
+        "title": parser.title,
+        "headers": parser.headers,
+        "metadata": {
+            **parser.meta,
+            "canonical": parser.canonical,
+            "og_tags": parser.og_tags,
+            "twitter_tags": parser.twitter_tags,
+            "product_tags": parser.product_tags,
+            "schema_org": parser.schema_org or None,
+        },
+    }
+
+
+def _has_type(node: dict, *types: str) -> bool:
+    node_type = node.get("@type")
+    node_types = node_type if isinstance(node_type, list) else [node_type]
+    return any(t in types for t in node_types)
+
+
+def find_schema_products(schema_org: Any) -> List[dict]:
+    """Returns every schema.org Product node, including ones nested in @graph"""
+    products = []
+
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+        elif isinstance(node, dict):
+            if _has_type(node, "Product", "ProductGroup"):
+                products.append(node)
+                return
+            for value in node.values():
+                if isinstance(value, (list, dict)):
+                    walk(value)
+
+    walk(schema_org)
+    return products
+
+
+def _first(value: Any) -> Any:
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _text(value: Any) -> str:
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@id")
+    return str(value).strip() if value is not None else ""
+
+
+def _images(value: Any) -> List[str]:
+    values = value if isinstance(value, list) else [value]
+    images = []
+    for image in values:
+        if isinstance(image, dict):
+            image = image.get("url") or image.get("contentUrl")
+        if isinstance(image, str) and image:
+            images.append(image)
+    return images
+
+
+def _availability(value: Any) -> str:
+    value = _text(value)
+    key = value.rsplit("/", 1)[-1].lower()
+    return AVAILABILITY_MAP.get(key, "unknown")
+
+
+def _offer(product: dict) -> dict:
+    offer = _first(product.get("offers")) or {}
+    if not isinstance(offer, dict):
+        return {}
+    if _has_type(offer, "AggregateOffer") and offer.get("offers"):
+        nested = _first(offer.get("offers"))
+        if isinstance(nested, dict):
+            return {**offer, **nested}
+    return offer
+
+
+def product_from_structured_data(
+    metadata: Dict[str, Any], page_url: str = None
+) -> Dict[str, Any]:
+    """
+    Build a product info dict (same keys as extract_product_info.js) from the
+    schema.org Product and OpenGraph/product meta tags of a page.
+    Args:
+        metadata: metadata dict as returned by extract_metadata.js
+        page_url: url of the product page
+    Returns:
+        product info dict, empty values for anything the page does not expose
+    """
+    metadata = metadata or {}
+    og_tags = metadata.get("og_tags") or {}
+    product_tags = metadata.get("product_tags") or {}
+    schema_products = find_schema_products(metadata.get("schema_org") or [])
+    product = schema_products[0] if schema_products else {}
+
+    offer = _offer(product)
+    price_spec = _first(offer.get("priceSpecification")) or {}
+    price = (
+        offer.get("price")
+        or offer.get("lowPrice")
+        or (price_spec.get("price") if isinstance(price_spec, dict) else None)
+        or product_tags.get("price:amount")
+        or og_tags.get("price:amount")
+    )
+    currency = (
+        offer.get("priceCurrency")
+        or (price_spec.get("priceCurrency") if isinstance(price_spec, dict) else None)
+        or product_tags.get("price:currency")
+        or og_tags.get("price:currency")
+    )
+    rating = product.get("aggregateRating") or {}
+
+    images = _images(product.get("image")) or _images(og_tags.get("image"))
+    if page_url:
+        images = [urljoin(page_url, image) for image in images]
+
+    return {
+        "id": _text(product.get("sku")) or _text(product.get("productID")),
+        "title": _text(product.get("name")) or og_tags.get("title", ""),
+        "price": str(price) if price is not None else "",
+        "sale_price": str(price) if price is not None else None,
+        "regular_price": None,
+        "currency": _text(currency),
+        "description": _text(product.get("description"))
+        or og_tags.get("description", "")
+        or metadata.get("description")
+        or "",
+        "category": _text(product.get("category")),
+        "availability": _availability(
+            offer.get("availability") or product_tags.get("availability")
+        ),
+        "variants": None,
+        "images": images,
+        "url": _text(offer.get("url")) or metadata.get("canonical") or page_url,
+        "brand": _text(product.get("brand")),
+        "gtin": _text(
+            product.get("gtin13")
+            or product.get("gtin")
+            or product.get("gtin12")
+            or product.get("gtin14")
+            or product.get("gtin8")
+        ),
+        "mpn": _text(product.get("mpn")),
+        "ratings": (
+            _text(rating.get("ratingValue")) if isinstance(rating, dict) else ""
+        ),
+    }
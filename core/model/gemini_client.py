@@ -0,0 +1,57 @@
+from typing import Optional
+from google import genai
+from google.genai import types
+
+from config.env_variables import get_settings
+from core.utils.logger import Logger
+
+
+class GeminiClient:
+    """
+    Long lived vertex ai client shared by every model call.
+
+    The underlying http connections are pooled by the sdk client, and every
+    call goes through the sdk's async surface so a single worker can keep
+    many model requests in flight without blocking the event loop.
+    """
+
+    def __init__(self, project: str, location: str):
+        self.logger = Logger.get_logger(__name__)
+        self._client = genai.Client(vertexai=True, project=project, location=location)
+
+    async def generate_content(
+        self, model: str, contents=None, config=None
+    ) -> types.GenerateContentResponse:
+        return await self._client.aio.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+
+    async def generate_videos(
+        self, model: str, prompt: str, config=None
+    ) -> types.GenerateVideosOperation:
+        return await self._client.aio.models.generate_videos(
+            model=model, prompt=prompt, config=config
+        )
+
+    async def get_operation(
+        self, operation: types.GenerateVideosOperation
+    ) -> types.GenerateVideosOperation:
+        return await self._client.aio.operations.get(operation)
+
+
+_gemini_client: Optional[GeminiClient] = None
+
+
+def get_gemini_client() -> GeminiClient:
+    """
+    Get the process-wide gemini client.
+    """
+    global _gemini_client
+
+    if _gemini_client is None:
+        settings = get_settings()
+        _gemini_client = GeminiClient(
+            project=settings.GOOGLE_PROJECT_ID,
+            location=settings.GOOGLE_SERVER_LOCATION,
+        )
+    return _gemini_client
@@ -0,0 +1,179 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from config.env_variables import get_settings
+from core.model.scheduler import get_model_scheduler
+from core.utils.logger import Logger
+from exceptions.model_deadline_exceeded_error import ModelDeadlineExceededError
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * p / 100))
+        return ordered[index]
+
+
+@dataclass
+class HedgingStats:
+    calls: int = 0
+    hedges_fired: int = 0
+    hedges_won: int = 0
+    deadline_exceeded: int = 0
+
+
+class ModelHedger:
+    """
+    Deadlines and hedged requests for model calls.
+
+    A hedged call fires a duplicate once the first attempt has been running
+    longer than the model's recent latency percentile, takes whichever answers
+    first and cancels the other, so tail latency tracks the median.
+    """
+
+    def __init__(self, percentile: float, min_samples: int, window: int):
+        self.logger = Logger.get_logger(__name__)
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._stats: Dict[str, HedgingStats] = {}
+
+    def _tracker(self, model: str) -> LatencyTracker:
+        return self._latencies.setdefault(model, LatencyTracker(self.window))
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds to wait before hedging, None until enough samples exist"""
+        tracker = self._tracker(model)
+        if len(tracker) < self.min_samples:
+            return None
+        return tracker.percentile(self.percentile)
+
+    async def call(
+        self,
+        model: str,
+        attempt: Callable[[], Awaitable[T]],
+        deadline: Optional[float] = None,
+        hedge: bool = False,
+    ) -> T:
+        """
+        Run a model call with an optional deadline and hedging.
+        Args:
+            model: model name, latencies are tracked per model
+            attempt: starts one request, called again for the hedge
+            deadline: seconds before ModelDeadlineExceededError, None waits
+            hedge: fire a duplicate request after the percentile latency
+        Returns:
+            response of the first attempt to succeed
+        """
+        stats = self._stats.setdefault(model, HedgingStats())
+        stats.calls += 1
+
+        try:
+            return await asyncio.wait_for(
+                self._race(model, attempt, stats, hedge), timeout=deadline
+            )
+        except asyncio.TimeoutError:
+            stats.deadline_exceeded += 1
+            raise ModelDeadlineExceededError(
+                f"{model} did not answer within {deadline}s"
+            )
+
+    async def _timed(self, attempt: Callable[[], Awaitable[T]]):
+        started = time.monotonic()
+        response = await attempt()
+        return response, time.monotonic() - started
+
+    async def _race(
+        self,
+        model: str,
+        attempt: Callable[[], Awaitable[T]],
+        stats: HedgingStats,
+        hedge: bool,
+    ) -> T:
+        primary = asyncio.create_task(self._timed(attempt))
+        tasks = [primary]
+        try:
+            delay = self.hedge_delay(model) if hedge else None
+            if delay is not None:
+                done, _ = await asyncio.wait([primary], timeout=delay)
+                # a hedge must not queue behind other calls or eat into quota
+                # the scheduler is already short of
+                if not done and get_model_scheduler().has_headroom(model):
+                    stats.hedges_fired += 1
+                    tasks.append(asyncio.create_task(self._timed(attempt)))
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+
+                    response, latency = task.result()
+                    self._tracker(model).record(latency)
+                    if task is not primary:
+                        stats.hedges_won += 1
+                    return response
+
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict:
+        def seconds(value: Optional[float]) -> Optional[float]:
+            return round(value, 3) if value is not None else None
+
+        return {
+            model: {
+                "calls": stats.calls,
+                "hedges_fired": stats.hedges_fired,
+                "hedges_won": stats.hedges_won,
+                "deadline_exceeded": stats.deadline_exceeded,
+                "p50": seconds(self._tracker(model).percentile(50)),
+                "hedge_after": seconds(self.hedge_delay(model)),
+            }
+            for model, stats in self._stats.items()
+        }
+
+
+_model_hedger: Optional[ModelHedger] = None
+
+
+def get_model_hedger() -> ModelHedger:
+    """
+    Get the process-wide model call hedger.
+    """
+    global _model_hedger
+
+    if _model_hedger is None:
+        settings = get_settings()
+        _model_hedger = ModelHedger(
+            percentile=settings.MODEL_HEDGE_PERCENTILE,
+            min_samples=settings.MODEL_HEDGE_MIN_SAMPLES,
+            window=settings.MODEL_LATENCY_WINDOW,
+        )
+    return _model_hedger
@@ -1,98 +1,155 @@
-import time
-from google import genai
 from google.genai import types
 
 from config.env_variables import get_settings
+from core.model.gemini_client import get_gemini_client
+from core.model.hedging import get_model_hedger
+from core.model.response_cache import get_response_cache, response_cache_key
+from core.model.scheduler import get_model_scheduler
+
+VEO_MODEL = "veo-2.0-generate-001"
+
+
+async def _call_model(model: str, contents=None, config=None):
+    """Call generate_content once the scheduler grants a slot for the model"""
+
+    async with get_model_scheduler().slot(model, contents, config) as slot:
+        response = await get_gemini_client().generate_content(
+            model=model, contents=contents, config=config
+        )
+        slot.record_usage(response)
+    return response
+
+
+async def _call_model_with_deadline(
+    model: str, contents=None, config=None, deadline=None, hedge=None
+):
+    """
+    Args:
+        deadline: seconds before ModelDeadlineExceededError, defaults to
+            MODEL_CALL_DEADLINE, 0 waits indefinitely
+        hedge: fire a duplicate request when the call runs into the latency
+            tail, defaults to MODEL_HEDGING_ENABLED
+    """
+    settings = get_settings()
+    if deadline is None:
+        deadline = settings.MODEL_CALL_DEADLINE
+    if hedge is None:
+        hedge = settings.MODEL_HEDGING_ENABLED
+
+    return await get_model_hedger().call(
+        model,
+        lambda: _call_model(model=model, contents=contents, config=config),
+        deadline=deadline or None,
+        hedge=hedge,
+    )
 
 
-def initialize_gemini(content=None, config=None):
-    """initialize gemini llm and returns model instance"""
+async def _generate_content(
+    model: str, contents=None, config=None, use_cache=True, deadline=None, hedge=None
+):
+    """
+    Call generate_content through the content-addressed response cache.
+    Args:
+        use_cache: False always calls the model and leaves the cache untouched
+        deadline: see _call_model_with_deadline
+        hedge: see _call_model_with_deadline
+    """
+    call_options = {"deadline": deadline, "hedge": hedge}
+
+    if not use_cache or not get_settings().MODEL_CACHE_ENABLED:
+        return await _call_model_with_deadline(
+            model=model, contents=contents, config=config, **call_options
+        )
+
+    cache = get_response_cache()
+    key = response_cache_key(model, contents, config)
+
+    cached = await cache.get(key)
+    if cached is not None:
+        return cached
+
+    response = await _call_model_with_deadline(
+        model=model, contents=contents, config=config, **call_options
+    )
+    await cache.set(key, response)
+    return response
+
+
+async def initialize_gemini(
+    content=None, config=None, use_cache=True, deadline=None, hedge=None
+):
+    """call gemini llm and returns the model response"""
 
-    settings = get_settings()
     generation_model = "gemini-2.0-flash-lite-001"
-    client = genai.Client(
-        vertexai=True,
-        project=settings.GOOGLE_PROJECT_ID,
-        location=settings.GOOGLE_SERVER_LOCATION,
-    )
 
-    return client.models.generate_content(
-        model=generation_model, contents=content, config=config
+    return await _generate_content(
+        model=generation_model,
+        contents=content,
+        config=config,
+        use_cache=use_cache,
+        deadline=deadline,
+        hedge=hedge,
     )
 
 
-def initialize_gemini_img(content=None, config=None):
-    settings = get_settings()
+async def initialize_gemini_img(
+    content=None, config=None, use_cache=False, deadline=None, hedge=False
+):
+    """
+    call gemini image generation, not hedged by default as every duplicate
+    image request is billed, and not cached unless asked for: responses are
+    MBs of image data and a repeat request is expected to yield a new image
+    """
     model = "gemini-2.0-flash-preview-image-generation"
-    client = genai.Client(
-        vertexai=True,
-        project=settings.GOOGLE_PROJECT_ID,
-        location=settings.GOOGLE_SERVER_LOCATION,
-    )
 
-    merge_config = None
+    merge_config = {"response_modalities": ["TEXT", "IMAGE"]}
 
-    if config is None:
-        merge_config = {"response_modalities": ["TEXT", "IMAGE"]}
-    elif config.__class__ == "dict":
-        merge_config = config | {"response_modalities": ["TEXT", "IMAGE"]}
+    if isinstance(config, dict):
+        merge_config = config | merge_config
 
-    # merge_conf = config | {"response_modalities": ["TEXT", "IMAGE"]}
-    return client.models.generate_content(
+    return await _generate_content(
         model=model,
         contents=content,
         config=types.GenerateContentConfig(**merge_config),
+        use_cache=use_cache,
+        deadline=deadline,
+        hedge=hedge,
     )
 
 
-def initialize_imagen(**model_config):
-    """initialize imagen llm for image edit"""
+async def initialize_imagen(use_cache=False, **model_config):
+    """call imagen llm for image edit, cached only when asked for"""
 
-    settings = get_settings()
-    client = genai.Client(
-        vertexai=True,
-        project=settings.google_project_id,
-        location=settings.google_application_credentials,
+    return await _generate_content(
+        model="imagen-3.0-generate-002", use_cache=use_cache, **model_config
     )
 
-    return client.models.generate_content(
-        model="imagen-3.0-generate-002", **model_config
-    )
 
+async def init_veo(contents=None, config=None) -> types.GenerateVideosOperation:
+    """
+    Submit a veo video generation.
+    Returns the long running operation, poll it with get_veo_operation.
+    """
 
-def init_veo(contents=None, config=None):
-    """Initialize veo client for generating vedio"""
+    merge_config = {
+        "aspect_ratio": "16:9",  # "16:9" or "9:16"
+    }
 
-    settings = get_settings()
-    model = "veo-2.0-generate-001"
-    client = genai.Client(
-        vertexai=True,
-        project=settings.google_project_id,
-        location=settings.google_server_location,
-    )
+    if isinstance(config, dict):
+        merge_config = config | merge_config
 
-    merge_config = None
-
-    if config is None:
-        merge_config = {
-            "aspect_ratio": "16:9",  # "16:9" or "9:16"
-        }
-    elif config.__class__ == "dict":
-        merge_config = config | {
-            "aspect_ratio": "16:9",  # "16:9" or "9:16"
-        }
-
-    operation = client.models.generate_videos(
-        model=model,
-        prompt=contents,
-        config=types.GenerateVideosConfig(**merge_config),
-    )
+    # only the submission counts against the veo quota, polling is free
+    async with get_model_scheduler().slot(VEO_MODEL, contents):
+        return await get_gemini_client().generate_videos(
+            model=VEO_MODEL,
+            prompt=contents,
+            config=types.GenerateVideosConfig(**merge_config),
+        )
 
-    while not operation.done:
-        time.sleep(20)
-        operation = client.operations.get(operation)
 
-    for n, generated_video in enumerate(operation.response.generated_videos):
-        generated_video.video.save(f"video{n}.mp4")  # save the video
+async def get_veo_operation(
+    operation: types.GenerateVideosOperation,
+) -> types.GenerateVideosOperation:
+    """Refresh the state of a submitted veo operation"""
 
-    return "saved"
+    return await get_gemini_client().get_operation(operation)
@@ -0,0 +1,321 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+from google.genai import types
+from PIL import Image
+from pydantic import BaseModel
+
+from config.env_variables import get_settings
+from core.utils.logger import Logger
+
+
+@dataclass
+class ResponseCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": (
+                (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            ),
+        }
+
+
+def _update_hash(digest, value: Any):
+    """Feed a prompt/config value into the digest, tagging each value by type"""
+    if value is None:
+        digest.update(b"n")
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        digest.update(b"s%d:" % len(data) + data)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        data = bytes(value)
+        digest.update(b"b%d:" % len(data) + data)
+    elif isinstance(value, (bool, int, float)):
+        digest.update(b"v" + repr(value).encode())
+    elif isinstance(value, BaseModel):
+        _update_hash(digest, value.model_dump(exclude_none=True))
+    elif isinstance(value, Image.Image):
+        _update_hash(digest, f"{value.mode}:{value.size}")
+        _update_hash(digest, value.tobytes())
+    elif isinstance(value, dict):
+        digest.update(b"d%d:" % len(value))
+        for key in sorted(value, key=str):
+            _update_hash(digest, str(key))
+            _update_hash(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"l%d:" % len(value))
+        for item in value:
+            _update_hash(digest, item)
+    else:
+        _update_hash(digest, repr(value))
+
+
+def response_cache_key(model: str, contents: Any, config: Any) -> str:
+    """
+    Content address of a model call.
+    Args:
+        model: model name
+        contents: prompt text, image parts/bytes or a list of them
+        config: generation config as dict or sdk config object
+    Returns:
+        sha256 hex digest
+    """
+    digest = hashlib.sha256()
+    _update_hash(digest, model)
+    _update_hash(digest, config)
+    _update_hash(digest, contents)
+    return digest.hexdigest()
+
+
+def is_cacheable(response: types.GenerateContentResponse) -> bool:
+    """Only complete answers are cached, never blocked or empty responses"""
+    if not response.candidates:
+        return False
+    candidate = response.candidates[0]
+    if candidate.finish_reason not in (None, types.FinishReason.STOP):
+        return False
+    return bool(candidate.content and candidate.content.parts)
+
+
+class ResponseCache:
+    """
+    Two tier cache of gemini responses keyed by response_cache_key.
+    An in-process LRU bounded by entry count and total response size sits in
+    front of a directory of json files that is trimmed to a maximum total
+    size, least recently used first. Entries of both tiers expire ttl_seconds
+    after they were stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_memory_bytes: int,
+        ttl_seconds: int,
+        cache_dir: str,
+        max_disk_bytes: int,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = ResponseCacheStats()
+        # key -> (expires at unix time, serialized size, response)
+        self._entries: (
+            "OrderedDict[str, Tuple[float, int, types.GenerateContentResponse]]"
+        ) = OrderedDict()
+        self._memory_bytes = 0
+        # key -> (file size, stored at unix time), least recently used first
+        self._disk_index: "Optional[OrderedDict[str, Tuple[int, float]]]" = None
+        self._disk_bytes = 0
+        self._disk_lock = asyncio.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _expires_at(self, stored_at: float) -> float:
+        return stored_at + self.ttl_seconds if self.ttl_seconds else float("inf")
+
+    def _memory_pop(self, key: str):
+        _, size, _ = self._entries.pop(key)
+        self._memory_bytes -= size
+
+    def _memory_get(self, key: str) -> Optional[types.GenerateContentResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, _, response = entry
+        if expires_at <= time.time():
+            self._memory_pop(key)
+            self.stats.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return response
+
+    def _memory_set(
+        self,
+        key: str,
+        response: types.GenerateContentResponse,
+        size: int,
+        expires_at: float,
+    ):
+        if key in self._entries:
+            self._memory_pop(key)
+        if size > self.max_memory_bytes:
+            # would evict the whole tier, the disk tier still serves it
+            return
+
+        self._entries[key] = (expires_at, size, response)
+        self._memory_bytes += size
+        while (
+            len(self._entries) > self.max_entries
+            or self._memory_bytes > self.max_memory_bytes
+        ):
+            self._memory_pop(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def _load_disk_index(self):
+        """Index the files already on disk, oldest access first."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    files.append(
+                        (stat.st_atime, entry.name[:-5], stat.st_size, stat.st_mtime)
+                    )
+
+        self._disk_index = OrderedDict(
+            (key, (size, stored_at)) for _, key, size, stored_at in sorted(files)
+        )
+        self._disk_bytes = sum(size for size, _ in self._disk_index.values())
+
+    def _disk_read(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as cached:
+                data = cached.read()
+            # atime is the last access across restarts, mtime stays the store time
+            os.utime(self._path(key), (time.time(), os.path.getmtime(self._path(key))))
+            return data
+        except FileNotFoundError:
+            return None
+
+    def _disk_write(self, key: str, data: str) -> Tuple[int, float]:
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as cached:
+            cached.write(data)
+        os.replace(tmp_path, self._path(key))
+        stat = os.stat(self._path(key))
+        return stat.st_size, stat.st_mtime
+
+    def _disk_remove(self, key: str):
+        size, _ = self._disk_index.pop(key)
+        self._disk_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _disk_evict(self) -> int:
+        evicted = 0
+        while self._disk_bytes > self.max_disk_bytes and self._disk_index:
+            self._disk_remove(next(iter(self._disk_index)))
+            evicted += 1
+        return evicted
+
+    async def _ensure_disk_index(self):
+        if self._disk_index is None:
+            await asyncio.to_thread(self._load_disk_index)
+
+    async def get(self, key: str) -> Optional[types.GenerateContentResponse]:
+        """
+        Look up a cached response.
+        Args:
+            key: response_cache_key of the call
+        Returns:
+            cached response or None on miss
+        """
+        response = self._memory_get(key)
+        if response is not None:
+            self.stats.memory_hits += 1
+            return response
+
+        data = None
+        try:
+            async with self._disk_lock:
+                await self._ensure_disk_index()
+                if key in self._disk_index:
+                    _, stored_at = self._disk_index[key]
+                    expires_at = self._expires_at(stored_at)
+                    if expires_at <= time.time():
+                        await asyncio.to_thread(self._disk_remove, key)
+                        self.stats.expirations += 1
+                    else:
+                        data = await asyncio.to_thread(self._disk_read, key)
+                        self._disk_index.move_to_end(key)
+
+            if data is not None:
+                response = types.GenerateContentResponse.model_validate_json(data)
+        except Exception as e:
+            self.logger.error(f"Model response cache read failed for {key}: {e}")
+            response = None
+
+        if response is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.disk_hits += 1
+        self._memory_set(key, response, len(data), expires_at)
+        return response
+
+    async def set(self, key: str, response: types.GenerateContentResponse):
+        """Store a response in both tiers, trimming both tiers to size."""
+        if not is_cacheable(response):
+            return
+
+        data = response.model_dump_json(exclude_none=True)
+        self._memory_set(key, response, len(data), self._expires_at(time.time()))
+        self.stats.stores += 1
+
+        try:
+            async with self._disk_lock:
+                await self._ensure_disk_index()
+                size, stored_at = await asyncio.to_thread(self._disk_write, key, data)
+                previous_size, _ = self._disk_index.pop(key, (0, 0.0))
+                self._disk_bytes += size - previous_size
+                self._disk_index[key] = (size, stored_at)
+                self.stats.evictions += await asyncio.to_thread(self._disk_evict)
+        except Exception as e:
+            self.logger.error(f"Failed to persist model response {key}: {e}")
+
+    def metrics(self) -> dict:
+        return {
+            **self.stats.as_dict(),
+            "memory_entries": len(self._entries),
+            "memory_mb": round(self._memory_bytes / 1024**2, 1),
+            "disk_entries": len(self._disk_index or ()),
+            "disk_mb": round(self._disk_bytes / 1024**2, 1),
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the process-wide model response cache.
+    """
+    global _response_cache
+
+    if _response_cache is None:
+        settings = get_settings()
+        _response_cache = ResponseCache(
+            max_entries=settings.MODEL_CACHE_MAX_ENTRIES,
+            max_memory_bytes=settings.MODEL_CACHE_MAX_MEMORY_MB * 1024**2,
+            ttl_seconds=settings.MODEL_CACHE_TTL_SECONDS,
+            cache_dir=settings.MODEL_CACHE_DIR,
+            max_disk_bytes=settings.MODEL_CACHE_MAX_DISK_MB * 1024**2,
+        )
+    return _response_cache
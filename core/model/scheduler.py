@@ -0,0 +1,365 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from google.genai import errors, types
+from pydantic import BaseModel
+
+from config.env_variables import get_settings
+from core.utils.logger import Logger
+from exceptions.model_queue_full_error import ModelQueueFullError
+
+# rough vertex ai accounting used to estimate a call before it is sent
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 258
+DEFAULT_OUTPUT_TOKENS = 512
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    BULK = 1
+
+
+# priority of model calls made by the current task, bulk jobs lower it
+model_call_priority: ContextVar[Priority] = ContextVar(
+    "model_call_priority", default=Priority.INTERACTIVE
+)
+
+
+@dataclass
+class ModelLimits:
+    concurrency: int
+    rpm: int
+    tpm: int = 0  # 0 disables the token bucket
+
+
+DEFAULT_MODEL_LIMITS: Dict[str, ModelLimits] = {
+    "gemini-2.0-flash-lite-001": ModelLimits(concurrency=16, rpm=300, tpm=1_000_000),
+    "gemini-2.0-flash-preview-image-generation": ModelLimits(
+        concurrency=4, rpm=60, tpm=200_000
+    ),
+    "imagen-3.0-generate-002": ModelLimits(concurrency=4, rpm=20),
+    "veo-2.0-generate-001": ModelLimits(concurrency=1, rpm=10),
+}
+FALLBACK_MODEL_LIMITS = ModelLimits(concurrency=4, rpm=60)
+
+
+class TokenBucket:
+    """Refills `per_minute` units evenly over a minute, up to one minute's worth"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = asyncio.get_running_loop().time()
+
+    def _refill(self):
+        now = asyncio.get_running_loop().time()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available"""
+        self._refill()
+        # a single call larger than the bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def drain(self):
+        """Empty the bucket, used when the backend reports quota exhaustion"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+@dataclass
+class ModelCallSlot:
+    model: str
+    estimated_tokens: int
+    actual_tokens: Optional[int] = None
+
+    def record_usage(self, response: Any):
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None and usage.total_token_count:
+            self.actual_tokens = usage.total_token_count
+
+
+@dataclass
+class ModelSchedulerStats:
+    scheduled: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    quota_errors: int = 0
+
+
+class _ModelQueue:
+    """Priority queue and rate limits of a single model"""
+
+    def __init__(self, model: str, limits: ModelLimits, max_queue: int):
+        self.model = model
+        self.limits = limits
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.stats = ModelSchedulerStats()
+        self.requests = TokenBucket(limits.rpm)
+        self.tokens = TokenBucket(limits.tpm) if limits.tpm else None
+        self._waiters: List[Tuple[int, int, asyncio.Future, int]] = []
+        self._order = itertools.count()
+        self._changed = asyncio.Event()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _wait_time(self, estimated_tokens: int) -> float:
+        wait = self.requests.wait_time(1)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(estimated_tokens))
+        return wait
+
+    def retry_after(self) -> float:
+        return max(1.0, self._wait_time(DEFAULT_OUTPUT_TOKENS))
+
+    @property
+    def queued(self) -> int:
+        """Calls still waiting, callers that gave up leave cancelled futures"""
+        live = [waiter for waiter in self._waiters if not waiter[2].done()]
+        if len(live) != len(self._waiters):
+            heapq.heapify(live)
+            self._waiters = live
+        return len(self._waiters)
+
+    def check_capacity(self):
+        """Raise ModelQueueFullError when no further call may queue"""
+        queued = self.queued
+        if queued >= self.max_queue:
+            self.stats.rejected += 1
+            raise ModelQueueFullError(
+                f"{queued} calls already queued for {self.model}",
+                retry_after=self.retry_after(),
+            )
+
+    def submit(self, priority: Priority, estimated_tokens: int) -> asyncio.Future:
+        self.check_capacity()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters,
+            (int(priority), next(self._order), future, estimated_tokens),
+        )
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        self._changed.set()
+        return future
+
+    def release(self, slot: ModelCallSlot):
+        self.in_flight -= 1
+        if self.tokens is not None and slot.actual_tokens is not None:
+            # settle the estimate against the usage vertex ai reported
+            self.tokens.consume(slot.actual_tokens - slot.estimated_tokens)
+        self._changed.set()
+
+    def penalize(self):
+        """Stop dispatching until the buckets refill after a quota error."""
+        self.stats.quota_errors += 1
+        self.requests.drain()
+        if self.tokens is not None:
+            self.tokens.drain()
+        self._changed.set()
+
+    async def _dispatch(self):
+        while self._waiters:
+            # callers that gave up leave cancelled futures behind
+            while self._waiters and self._waiters[0][2].done():
+                heapq.heappop(self._waiters)
+            if not self._waiters:
+                break
+
+            self._changed.clear()
+            _, _, future, estimated_tokens = self._waiters[0]
+            if self.in_flight >= self.limits.concurrency:
+                wait = None
+            else:
+                wait = self._wait_time(estimated_tokens)
+
+            if wait == 0.0:
+                heapq.heappop(self._waiters)
+                self.requests.consume(1)
+                if self.tokens is not None:
+                    self.tokens.consume(estimated_tokens)
+                self.in_flight += 1
+                self.stats.scheduled += 1
+                future.set_result(None)
+                continue
+
+            # woken early by a release, a new waiter or a quota error
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def as_dict(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "scheduled": self.stats.scheduled,
+            "rejected": self.stats.rejected,
+            "timed_out": self.stats.timed_out,
+            "quota_errors": self.stats.quota_errors,
+        }
+
+
+def _estimate_value_tokens(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value) // CHARS_PER_TOKEN
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return IMAGE_TOKENS
+    if isinstance(value, types.Part):
+        if value.text:
+            return len(value.text) // CHARS_PER_TOKEN
+        return IMAGE_TOKENS
+    if isinstance(value, types.Content):
+        return _estimate_value_tokens(value.parts)
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_value_tokens(item) for item in value)
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json(exclude_none=True)) // CHARS_PER_TOKEN
+    return IMAGE_TOKENS
+
+
+def estimate_tokens(contents: Any, config: Any = None) -> int:
+    """Estimated prompt + output tokens of a call, settled after the response"""
+    if isinstance(config, dict):
+        max_output = config.get("max_output_tokens")
+    else:
+        max_output = getattr(config, "max_output_tokens", None)
+    return _estimate_value_tokens(contents) + (max_output or DEFAULT_OUTPUT_TOKENS)
+
+
+class ModelScheduler:
+    """
+    Admission control in front of every model call.
+
+    Each model gets a concurrency limit, requests/tokens per minute buckets
+    and a bounded priority queue where interactive calls overtake bulk ones.
+    A full queue or a call that waits past the queue timeout fails fast with
+    ModelQueueFullError instead of piling more load onto the quota.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, ModelLimits],
+        max_queue: int,
+        queue_timeout: float,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.limits = limits
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._queues: Dict[str, _ModelQueue] = {}
+
+    def _queue(self, model: str) -> _ModelQueue:
+        queue = self._queues.get(model)
+        if queue is None:
+            queue = _ModelQueue(
+                model,
+                self.limits.get(model, FALLBACK_MODEL_LIMITS),
+                self.max_queue,
+            )
+            self._queues[model] = queue
+        return queue
+
+    @asynccontextmanager
+    async def slot(
+        self, model: str, contents: Any = None, config: Any = None
+    ) -> AsyncIterator[ModelCallSlot]:
+        """
+        Wait for a model call slot.
+        Args:
+            model: model name the call goes to
+            contents: prompt, used to estimate the token cost
+            config: generation config, used for the output token budget
+        Returns:
+            slot to report the response usage on
+        """
+        queue = self._queue(model)
+        call = ModelCallSlot(model, estimate_tokens(contents, config))
+
+        future = queue.submit(model_call_priority.get(), call.estimated_tokens)
+        try:
+            await asyncio.wait_for(future, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            queue.stats.timed_out += 1
+            raise ModelQueueFullError(
+                f"no {model} capacity after {self.queue_timeout}s",
+                retry_after=queue.retry_after(),
+            )
+        except asyncio.CancelledError:
+            # the slot may have been granted right before the caller went away
+            if future.done() and not future.cancelled():
+                queue.release(call)
+            raise
+
+        try:
+            yield call
+        except errors.APIError as e:
+            if e.code == 429:
+                self.logger.warning(f"Quota exhausted for {model}, backing off.")
+                queue.penalize()
+            raise
+        finally:
+            queue.release(call)
+
+    def has_headroom(self, model: str) -> bool:
+        """True when a new call to the model would start without queueing"""
+        queue = self._queues.get(model)
+        if queue is None:
+            return True
+        return not queue.queued and queue.in_flight < queue.limits.concurrency
+
+    def check_capacity(self, model: str):
+        """
+        Fail fast with ModelQueueFullError when the model's queue is full, for
+        callers that defer the actual call to a background task.
+        """
+        self._queue(model).check_capacity()
+
+    def stats(self) -> dict:
+        return {model: queue.as_dict() for model, queue in self._queues.items()}
+
+
+_model_scheduler: Optional[ModelScheduler] = None
+
+
+def get_model_scheduler() -> ModelScheduler:
+    """
+    Get the process-wide model call scheduler.
+    """
+    global _model_scheduler
+
+    if _model_scheduler is None:
+        settings = get_settings()
+        limits = dict(DEFAULT_MODEL_LIMITS)
+        for model, overrides in settings.MODEL_RATE_LIMITS.items():
+            base = limits.get(model, FALLBACK_MODEL_LIMITS)
+            limits[model] = ModelLimits(
+                concurrency=overrides.get("concurrency", base.concurrency),
+                rpm=overrides.get("rpm", base.rpm),
+                tpm=overrides.get("tpm", base.tpm),
+            )
+        _model_scheduler = ModelScheduler(
+            limits=limits,
+            max_queue=settings.MODEL_QUEUE_MAX_SIZE,
+            queue_timeout=settings.MODEL_QUEUE_TIMEOUT,
+        )
+    return _model_scheduler
@@ -1,41 +1,63 @@
 from global_type.product_base import ProductIndustryEnum, ProductTemplateEnum
 
 
-prompt = """You are an eCommerce data extraction assistant. Your task is to extract structured product data from a product screenshot.
+PRODUCT_FIELDS = {
+    "name": "short clear name for the product that should not be more than 3 words",
+    "sale_price": "price after the offer",
+    "regular_price": "price without offer",
+    "offer": "",
+    "currency": 'like INR for "₹", USD for "$" etc',
+    "category": "(must be one of: {categories})",
+    "description": "Empty string if not found",
+    "template_type": "(must be one of: {template_types})",
+    "ratings": "average rating of product",
+    "stock": "(number of items left, out_of_stock if items is out of stock, no_inventory_found false if not inventory details is found )",
+}
+
+VIDEO_AD_FIELDS = {
+    "platform": "like Facebook, Instagram, Whatsapp",
+    "feature_1": "- product_features (all features list in bullet point). Empty if not found",
+    "feature_2": "- product_features (all features list in bullet point). Empty if not found",
+    "feature_3": "- product_features (all features list in bullet point). Empty if not found",
+    "feature_4": "- product_features (all features list in bullet point). Empty if not found",
+    "feature_5": "- product_features (all features list in bullet point). Empty if not found",
+    "color_palette": "- color palette based on the theme and color of the product",
+    "style": "",
+    "lighting": "",
+    "ambiance": "",
+    "cta_text": "",
+    "aspect_ratio": "defaults to 9:16",
+    "duration": "max 8 sec",
+}
+
+PRODUCT_PROMPT_FIELDS = [*PRODUCT_FIELDS, *VIDEO_AD_FIELDS]
+
+prompt = """You are an eCommerce data extraction assistant. Your task is to extract structured product data from a product screenshot or page text.
 Return the result in JSON format. Extract the following fields:
 
-- name short clear name for the product that should not be more than 3 words
-- sale_price price after the offer
-- regular_price price without offer
-- offer 
-- currency like INR for "₹", USD for "$" etc
-- category (must be one of: {categories})
-- description Empty string if not found
-- template_type (must be one of: {template_types})
-- ratings average rating of product
-- stock (number of items left, out_of_stock if items is out of stock, no_inventory_found false if not inventory details is found )
+{product_fields}
 
 
 **Video Ad Metadata Fields:**
 
-- platform  like Facebook, Instagram, Whatsapp
-- feature_1  - product_features (all features list in bullet point). Empty if not found
-- feature_2  - product_features (all features list in bullet point). Empty if not found 
-- feature_3  - product_features (all features list in bullet point). Empty if not found
-- feature_4  - product_features (all features list in bullet point). Empty if not found
-- feature_5  - product_features (all features list in bullet point). Empty if not found
-- color_palette  - color palette based on the theme and color of the product
-- style         
-- lighting  
-- ambiance  
-- cta_text  
-- aspect_ratio defaults to 9:16 
-- duration  max 8 sec
+{video_ad_fields}
 
 Ensure accurate mapping based on visual layout and text. Only return a valid JSON object."""
 
 
-def get_product_prompt():
+def _field_lines(fields: dict, requested) -> str:
+    return "\n".join(
+        f"- {name} {description}".rstrip()
+        for name, description in fields.items()
+        if requested is None or name in requested
+    )
+
+
+def get_product_prompt(fields=None):
+    """
+    Args:
+        fields: names of the fields the model should extract, all when None
+    """
     from langchain_core.prompts import PromptTemplate
 
     categories_list = [
@@ -58,7 +80,11 @@ def get_product_prompt():
     categories_str = "".join([f'"{c}"' for c in categories_list])
     template_str = "".join([f'"{c}"' for c in template_list])
 
-    template = PromptTemplate.from_template(prompt)
+    template = PromptTemplate.from_template(
+        prompt.replace(
+            "{product_fields}", _field_lines(PRODUCT_FIELDS, fields)
+        ).replace("{video_ad_fields}", _field_lines(VIDEO_AD_FIELDS, fields))
+    )
 
     return template.invoke(
         {"categories": categories_str, "template_types": template_str}
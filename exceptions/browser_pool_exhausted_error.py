@@ -0,0 +1,9 @@
+class BrowserPoolExhaustedError(Exception):
+    """Exception raised when no browser lease can be acquired from the pool."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+    def __str__(self):
+        return f"BrowserPoolExhaustedError: {self.message}"
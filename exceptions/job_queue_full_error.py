@@ -0,0 +1,9 @@
+class JobQueueFullError(Exception):
+    """Exception raised when a background job queue cannot take more work."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+    def __str__(self):
+        return f"JobQueueFullError: {self.message}"
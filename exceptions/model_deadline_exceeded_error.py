@@ -0,0 +1,9 @@
+class ModelDeadlineExceededError(Exception):
+    """Exception raised when a model call does not answer within its deadline."""
+
+    def __init__(self, message: str):
+        super().__init__(message)
+        self.message = message
+
+    def __str__(self):
+        return f"ModelDeadlineExceededError: {self.message}"
@@ -0,0 +1,10 @@
+class ModelQueueFullError(Exception):
+    """Exception raised when a model call cannot be scheduled within quota."""
+
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+
+    def __str__(self):
+        return f"ModelQueueFullError: {self.message}"
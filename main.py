@@ -3,8 +3,15 @@
 import sys
 from fastapi import FastAPI
 from config.get_db_session import init_db
+from core.browser.browser_pool import get_browser_pool
+from core.browser.http_client import close_http_client
+from core.model.gemini_client import get_gemini_client
 from routers.banner import banner
+from services.og_banner_job_service import get_og_banner_job_queue
+from services.variant_renderer import get_variant_renderer
+from services.vedio_job_service import get_veo_job_manager
 from routers.vedio import routes
+from routers.metrics import routes as metrics_routes
 from middleware.cors import add_cors
 
 
@@ -28,6 +35,8 @@ add_cors(app)
 @app.on_event("startup")
 async def startup_event():
     await init_db()
+    await get_browser_pool().start()
+    get_gemini_client()
 
     import signal
 
@@ -35,7 +44,17 @@ async def startup_event():
     # startup tasks
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    await get_og_banner_job_queue().stop()
+    get_variant_renderer().stop()
+    await get_veo_job_manager().stop()
+    await get_browser_pool().stop()
+    await close_http_client()
+
+
 app.include_router(
     banner.router,
 )
 app.include_router(routes.router)
+app.include_router(metrics_routes.router)
@@ -7,6 +7,7 @@ from sqlalchemy import (
     Text,
     Boolean,
     Float,
+    BigInteger,
     ForeignKey,
     UUID as UUID_TYPE,
 )
@@ -27,6 +28,8 @@ class BannerVariant(Base):
     prompt_seed = Column(String(100))
     style_variation = Column(String(50))
     color_scheme = Column(String(50))
+    # rendition size (rendition_service.PLATFORM_SIZES), None for style variants
+    platform = Column(String(50))
 
     s3_url = Column(String(500))
     s3_key = Column(String(300))
@@ -34,6 +37,10 @@ class BannerVariant(Base):
     s3_preview_key = Column(String(300))
     file_size = Column(Integer)
     preview_size = Column(Integer)
+    # perceptual_hash.dhash of the rendered banner, signed 64 bit
+    phash = Column(BigInteger, index=True)
+    # perceptual_hash.color_signature of the rendered banner
+    color_hash = Column(BigInteger)
 
     generation_time = Column(Float)
     status = Column(String(20), default="pending")
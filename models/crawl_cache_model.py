@@ -0,0 +1,19 @@
+from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy.sql import func
+
+from models.banner_var_model import Base
+
+
+class CrawlCacheEntry(Base):
+    __tablename__ = "crawl_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    canonical_url = Column(String(1000), unique=True, nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=True)
+
+    # formatted crawl response as returned by BannerService.get_product_info
+    payload = Column(JSON, nullable=False)
+
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,27 @@
+from sqlalchemy import JSON, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+
+from models.banner_var_model import Base
+
+
+class DomainProfile(Base):
+    __tablename__ = "domain_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain = Column(String(255), unique=True, nullable=False, index=True)
+
+    # selectors of extract_product_info.js that matched on the last visit
+    product_selector = Column(String(300))
+    title_selector = Column(String(300))
+    price_selector = Column(String(300))
+    description_selector = Column(String(300))
+
+    # field -> {"dom": n, "llm": n}, where each field value came from
+    field_sources = Column(JSON, default=dict)
+    crawl_count = Column(Integer, default=0)
+
+    # "vision" or "text", None uses the PRODUCT_EXTRACTION_MODE setting
+    extraction_mode = Column(String(20))
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
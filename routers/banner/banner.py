@@ -1,14 +1,30 @@
+import json
 from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config.env_variables import get_settings
 from config.get_db_session import get_db
+from core.agent.domain_profile import get_domain_profile_store
 from core.agent.product_agent import ProductAgent
 from core.utils.logger import Logger
+from exceptions.browser_pool_exhausted_error import BrowserPoolExhaustedError
+from exceptions.job_queue_full_error import JobQueueFullError
+from exceptions.model_deadline_exceeded_error import ModelDeadlineExceededError
+from exceptions.model_queue_full_error import ModelQueueFullError
 from services.banner_service import BannerService
+from services.bulk_crawl_service import get_bulk_crawl_service
+from services.job_store import JobStatus, get_job_store
+from services.og_banner_job_service import (
+    OG_BANNER_JOB_KIND,
+    get_og_banner_job_queue,
+)
 from .request_types import (
+    BulkCrawlProductPagesRequest,
     CrawlProductPageRequest,
     CreateOGBannerRequest,
+    DomainExtractionModeRequest,
 )
 
 router = APIRouter(prefix="/banner", tags=["Banners"])
@@ -31,11 +47,58 @@ async def crawl_product_page(
             db, s3_fact=S3Service, variation_service=BannerVariantService()
         )
 
-        return await bannerService.get_product_info(banner.productURL, agent)
+        return await bannerService.get_product_info(
+            banner.productURL, agent, force_refresh=banner.force_refresh
+        )
+    except BrowserPoolExhaustedError as poolErr:
+        logger.warning(f"browser pool exhausted: {poolErr}")
+        raise HTTPException(status_code=503, detail=str(poolErr))
+    except ModelQueueFullError as queueErr:
+        logger.warning(f"model queue full: {queueErr}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(queueErr),
+            headers={"Retry-After": str(round(queueErr.retry_after))},
+        )
+    except ModelDeadlineExceededError as deadlineErr:
+        logger.warning(f"model deadline exceeded: {deadlineErr}")
+        raise HTTPException(status_code=504, detail=str(deadlineErr))
     except SQLAlchemyError as sqlErr:
         logger.error(f"failed to save to db: {sqlErr}")
     except Exception as e:
-        raise HTTPException(status_code=500, details=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/crawl_product_pages")
+async def crawl_product_pages(bulk: BulkCrawlProductPagesRequest = Body(...)):
+    """Crawl many product pages, streaming one NDJSON line per url as it completes."""
+
+    max_urls = get_settings().BULK_CRAWL_MAX_URLS
+    if len(bulk.productURLs) > max_urls:
+        raise HTTPException(
+            status_code=422, detail=f"at most {max_urls} urls per request"
+        )
+
+    async def stream_results():
+        async for result in get_bulk_crawl_service().crawl(
+            bulk.productURLs, force_refresh=bulk.force_refresh
+        ):
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.put("/domain_profiles/{domain}/extraction_mode")
+async def set_domain_extraction_mode(
+    domain: str, body: DomainExtractionModeRequest = Body(...)
+):
+    """Switch a domain between screenshot (vision) and page text extraction."""
+
+    domain = domain.strip().lower().removeprefix("www.")
+    profile = await get_domain_profile_store().set_extraction_mode(
+        domain, body.extraction_mode
+    )
+    return {"domain": profile.domain, "extraction_mode": profile.extraction_mode}
 
 
 @router.post("/create_product_og_banner")
@@ -59,8 +122,91 @@ async def create_product_og_banner(
         return await banner.create_og_banner(
             **banner_info_dump.get("product_info"),
         )
+    except ModelQueueFullError as queueErr:
+        logger.warning(f"model queue full: {queueErr}")
+        raise HTTPException(
+            status_code=429,
+            detail=str(queueErr),
+            headers={"Retry-After": str(round(queueErr.retry_after))},
+        )
+    except ModelDeadlineExceededError as deadlineErr:
+        logger.warning(f"model deadline exceeded: {deadlineErr}")
+        raise HTTPException(status_code=504, detail=str(deadlineErr))
     except ValueError as ve:
         logger.error(f"validation error:{str(ve)}")
     except Exception as e:
         logger.error(f"error occured in create_product_og_banner:{e}")
-        raise HTTPException(status_code=500, details=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/products/{product_id}/renditions")
+async def get_product_renditions(product_id: int, db: AsyncSession = Depends(get_db)):
+    """Platform sized renditions of the product's latest OG banners."""
+
+    from services.s3_service import S3Service
+    from services.banner_variant_service import BannerVariantService
+
+    banner = BannerService(
+        db, s3_fact=S3Service, variation_service=BannerVariantService()
+    )
+    return {
+        "product_id": product_id,
+        "renditions": await banner.get_renditions(product_id),
+    }
+
+
+@router.post("/create_product_og_banner/jobs", status_code=202)
+async def create_product_og_banner_job(og_banner_info: CreateOGBannerRequest):
+    """Queue OG banner generation, follow it by polling or server-sent events."""
+
+    try:
+        job = get_og_banner_job_queue().submit(
+            og_banner_info.model_dump().get("product_info")
+        )
+    except JobQueueFullError as queueErr:
+        raise HTTPException(status_code=503, detail=str(queueErr))
+
+    return {
+        "job_id": job.id,
+        "status_url": f"{router.prefix}/og_banner_jobs/{job.id}",
+        "events_url": f"{router.prefix}/og_banner_jobs/{job.id}/events",
+    }
+
+
+def _get_og_banner_job(job_id: str):
+    job = get_job_store().get(job_id)
+    if job is None or job.kind != OG_BANNER_JOB_KIND:
+        raise HTTPException(status_code=404, detail=f"job {job_id} not found")
+    return job
+
+
+@router.get("/og_banner_jobs/{job_id}")
+async def get_og_banner_job(job_id: str):
+    """Status, progress and banner urls of an OG banner job"""
+
+    return _get_og_banner_job(job_id).as_dict()
+
+
+@router.get("/og_banner_jobs/{job_id}/events")
+async def stream_og_banner_job(job_id: str):
+    """Server-sent events with a job snapshot on every progress update."""
+
+    job = _get_og_banner_job(job_id)
+    job_store = get_job_store()
+
+    async def stream_events():
+        queue = job_store.subscribe(job)
+        try:
+            while True:
+                snapshot = await queue.get()
+                yield f"data: {json.dumps(snapshot, default=str)}\n\n"
+                if snapshot["status"] in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+                    break
+        finally:
+            job_store.unsubscribe(job, queue)
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
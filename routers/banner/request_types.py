@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Tuple, Optional, List
+from typing import Literal, Tuple, Optional, List
 
 from core.agent.types import ProductBase
 from utils.consts import EIGHT_MB, EIGHT_SECONDS_MS
@@ -7,6 +7,17 @@ from utils.consts import EIGHT_MB, EIGHT_SECONDS_MS
 
 class CrawlProductPageRequest(BaseModel):
     productURL: str
+    force_refresh: bool = False
+
+
+class BulkCrawlProductPagesRequest(BaseModel):
+    productURLs: List[str]
+    force_refresh: bool = False
+
+
+class DomainExtractionModeRequest(BaseModel):
+    # None falls back to the PRODUCT_EXTRACTION_MODE setting
+    extraction_mode: Optional[Literal["vision", "text"]] = None
 
 
 class GetBannerPromptRequest(BaseModel):
@@ -0,0 +1,33 @@
+from fastapi import APIRouter
+
+from core.agent.extraction_metrics import get_extraction_metrics
+from core.browser.browser_pool import get_browser_pool
+from core.model.hedging import get_model_hedger
+from core.model.response_cache import get_response_cache
+from core.model.scheduler import get_model_scheduler
+from services.crawl_cache_service import get_crawl_cache
+from services.job_store import get_job_store
+from services.og_banner_job_service import get_og_banner_job_queue
+from services.variant_renderer import get_variant_renderer
+from services.vedio_job_service import get_veo_job_manager
+
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("")
+async def get_metrics():
+    """In-process counters of the crawl and generation pipeline"""
+
+    return {
+        "browser_pool": get_browser_pool().stats(),
+        "crawl_cache": get_crawl_cache().stats.as_dict(),
+        "model_cache": get_response_cache().metrics(),
+        "model_scheduler": get_model_scheduler().stats(),
+        "model_hedging": get_model_hedger().stats(),
+        "extraction": get_extraction_metrics().as_dict(),
+        "jobs": get_job_store().stats(),
+        "veo": get_veo_job_manager().stats(),
+        "og_banner_jobs": get_og_banner_job_queue().stats(),
+        "variant_renderer": get_variant_renderer().metrics(),
+    }
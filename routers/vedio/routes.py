@@ -1,7 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 
+from exceptions.model_queue_full_error import ModelQueueFullError
 from routers.banner.request_types import CreateVedioScriptRequest
+from services.job_store import get_job_store
+from services.vedio_job_service import VEO_JOB_KIND
 from services.vedio_service import VedioService
 
 
@@ -18,10 +21,23 @@ async def create_vedio_script(
         vedio_service = VedioService()
         # prompt = await vedio_service.generate_add_script(vedio_script_req.product_info)
         prompt = await vedio_service.generate_add_script({})
-        vedio = await vedio_service.create_vedio(prompt)
+        job = await vedio_service.create_vedio(prompt)
 
-        return JSONResponse(content={"success": True, "vedio": vedio}, status_code=200)
+        return JSONResponse(
+            content={
+                "success": True,
+                "job_id": job.id,
+                "status_url": f"{router.prefix}/jobs/{job.id}",
+            },
+            status_code=202,
+        )
 
+    except ModelQueueFullError as e:
+        return JSONResponse(
+            content={"success": False, "error": str(e), "message": "Model busy"},
+            status_code=429,
+            headers={"Retry-After": str(round(e.retry_after))},
+        )
     except Exception as e:
         return JSONResponse(
             content={
@@ -31,3 +47,14 @@ async def create_vedio_script(
             },
             status_code=500,
         )
+
+
+@router.get("/jobs/{job_id}")
+async def get_vedio_job(job_id: str):
+    """Status, progress and video urls of a video generation job"""
+
+    job = get_job_store().get(job_id)
+    if job is None or job.kind != VEO_JOB_KIND:
+        raise HTTPException(status_code=404, detail=f"job {job_id} not found")
+
+    return job.as_dict()
@@ -1,21 +1,28 @@
 import asyncio
 import random
-from io import BytesIO
+import time
+from dataclasses import dataclass
 from types import CoroutineType
-from PIL import Image
-from typing import Dict, Any, List, Tuple, TypeVar, Union
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple, TypeVar, Union
+from sqlalchemy import insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from tenacity import retry
 
+from config.env_variables import get_settings
 from core.agent.product_agent import ProductAgent
 from core.model.llm import initialize_gemini_img
 from core.utils.logger import Logger
 from exceptions.invalid_product_info_error import InvalidProductInfoError
 from models.banner_var_model import BannerVariant, Product
 from services.banner_variant_service import BannerVariantService
+from services.crawl_cache_service import get_crawl_cache
+from services.image_encoding import EncodedImage, GeneratedImage
+from services.perceptual_hash import PerceptualHash
 from services.prompt_factory import IndustryPromptFactory
+from services.rendition_service import RenditionService, platforms_for
 from services.s3_service import S3Service
+from services.variant_renderer import SharedImage, get_variant_renderer
 from utils.type_cast import str_to_float
 
 
@@ -26,13 +33,35 @@ type ProductInfoType = dict[str, Any]
 
 T = TypeVar("T", bound=S3Service)
 
+# (message, progress 0..1) reported while a banner is generated
+ProgressCallback = Callable[[str, float], None]
+
+
+@dataclass
+class UploadedBanner:
+    url: str
+    preview_url: str
+    file_size: int
+    preview_size: int
+    variant_number: int = 0
+    # rendition_service.PLATFORM_SIZES key, None for style variants
+    platform: Optional[str] = None
+    status: str = "completed"
+    generation_time: float = 0.0
+    phash: Optional[int] = None
+    color_hash: Optional[int] = None
+
 
 class BannerService:
 
     s3_factory: T = None
 
     def __init__(
-        self, db: AsyncSession, s3_fact: T, variation_service: BannerVariantService
+        self,
+        db: AsyncSession,
+        s3_fact: T,
+        variation_service: BannerVariantService,
+        rendition_service: Optional[RenditionService] = None,
     ):
         self.logger = Logger.get_logger(
             name=__class__,
@@ -40,16 +69,41 @@ class BannerService:
         self.db = db
         self.s3_factory = s3_fact
         self.var_service = variation_service
+        self.rendition_service = rendition_service or RenditionService()
+
+    async def get_product_info(
+        self, product_url: str, agent: ProductAgent, force_refresh: bool = False
+    ):
+        """
+        Crawl the product page, served from the crawl cache when possible
+        Args:
+            product_url: product page url
+            agent: agent used on cache miss
+            force_refresh: skip the cache lookup and re-crawl the page
+        """
+        crawl_cache = get_crawl_cache()
+
+        if not force_refresh:
+            cached = await crawl_cache.get(self.db, product_url)
+            if cached is not None:
+                self.logger.info(f"Crawl cache hit for {product_url}")
+                return cached
 
-    async def get_product_info(self, product_url: str, agent: ProductAgent):
-        product_info, headers, metadata = await agent.crawl_product_page(product_url)
+        crawl_result = await agent.crawl_product_page(product_url)
+        if isinstance(crawl_result, dict) and "error" in crawl_result:
+            raise InvalidProductInfoError(crawl_result["error"])
+
+        product_info, headers, metadata = crawl_result
         product = await self._save_product(product_info)
-        return BannerService._format_product_response(
+        response = BannerService._format_product_response(
             product={**product_info | {"id": product.id}},
             headers=headers,
             metadata=metadata,
         )
 
+        await crawl_cache.set(self.db, product_url, response, product_id=product.id)
+        return response
+
     @staticmethod
     def _format_product_response(
         product: Union[Dict[str, Any], Tuple[ProductInfoType]],
@@ -122,11 +176,37 @@ class BannerService:
 
     async def create_og_banner(
         self,
+        progress: Optional[ProgressCallback] = None,
         **product_info,
     ):
-        """Generate an banner with the given product information and size for requested platforms."""
+        """
+        Generate an banner with the given product information and size for requested platforms.
+        Args:
+            progress: called with (message, fraction) after each pipeline step
+        Returns:
+            style variant urls, the platform renditions are saved alongside,
+            see get_renditions()
+        """
+
+        banners = await self.generate_og_banners(progress=progress, **product_info)
+        return banners["variants"] if banners else None
+
+    async def generate_og_banners(
+        self,
+        progress: Optional[ProgressCallback] = None,
+        **product_info,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Generate the style variants and platform renditions of an OG banner.
+        Args:
+            progress: called with (message, fraction) after each pipeline step
+        Returns:
+            {"variants": style variant urls, "renditions": {platform: url}}
+        """
 
         self.logger.info("Creating OG banner with product information.")
+        report = progress or (lambda message, fraction: None)
+        started = time.monotonic()
 
         if not self._check_valid_og_banner_info(product_info):
             return None
@@ -137,65 +217,236 @@ class BannerService:
             # IndustryPromptFactory.validate_pr product_info(product_info)
             product_info
         )
+        report("Prompt built", 0.1)
+
+        response = await initialize_gemini_img(content=prompt_template)
+
+        generated = self._get_img_from(response, in_mem=True)
+        report("Base image ready", 0.5)
+
+        num_variants = 3
+        platforms = platforms_for(
+            product_info.get("target_platform"), product_info.get("platform")
+        )
+        uploaded = 0
 
-        response = initialize_gemini_img(content=prompt_template)
+        def on_upload(label: str):
+            nonlocal uploaded
+            uploaded += 1
+            fraction = 0.5 + 0.4 * uploaded / (num_variants + len(platforms))
+            report(f"{label} uploaded", fraction)
 
-        img_bytes = self._get_img_from(response, in_mem=True)
-        banners_urls = await self._create_upload_variants(
-            img_bytes, 3, product_name=product_info.get("product_name", "")
+        product_name = product_info.get("product_name", "")
+        existing_hashes = await self._existing_variant_hashes(
+            product_info.get("product_id")
         )
+        # one decode of the base banner feeds both variants and renditions
+        async with get_variant_renderer().share(generated) as base:
+            banners_urls, rendition_urls = await asyncio.gather(
+                self._create_upload_variants(
+                    base,
+                    num_variants,
+                    product_name=product_name,
+                    on_upload=on_upload,
+                    avoid_hashes=existing_hashes,
+                ),
+                self._create_upload_renditions(
+                    base, platforms, product_name=product_name, on_upload=on_upload
+                ),
+            )
 
         # save to DB
-        for i, s3_url in enumerate(banners_urls):
-            await self._save_banner_link(
-                s3_url,
-                product_id=product_info.get("product_id"),
-                variant_num=i,
-                db_session=self.db,
-            )
+        generated_banners = [*banners_urls, *rendition_urls.values()]
+        generation_time = time.monotonic() - started
+        for banner in generated_banners:
+            banner.generation_time = generation_time
+        await self.save_banner_variants(
+            product_info.get("product_id"), generated_banners
+        )
+        report("Banners saved", 1.0)
 
-        return banners_urls
+        return {
+            "variants": [banner.url for banner in banners_urls],
+            "renditions": {
+                platform: banner.url for platform, banner in rendition_urls.items()
+            },
+        }
 
         # await self._save_banner_link(
         #     s3_url, product_id=product_info.get("product_id"), variant_num=1
         # )
 
-    async def _generate_variant(self, base_img: bytes, num_var: int) -> List[bytes]:
+    async def _generate_variant(
+        self,
+        base: SharedImage,
+        num_var: int,
+        avoid_hashes: Iterable[PerceptualHash] = (),
+    ) -> List[EncodedImage]:
         """
         Creates multi variant for provided img
         Args:
-            base_img: bytes for img
+            base: shared base banner
             num_var: number of variant to be generated
+            avoid_hashes: perceptual hashes the new variants must not duplicate
 
         Returns:
-            list of bytes
+            list of encoded variants
         """
 
-        variant = self.var_service.generate_variants(base_img, num_variant=num_var)
-
-        return await asyncio.gather(*variant, return_exceptions=True)
+        return await self.var_service.generate_variants(
+            base, num_variant=num_var, avoid_hashes=avoid_hashes
+        )
 
     async def _create_upload_variants(
-        self, base_img: bytes, n: int, product_name: str
-    ) -> List[CoroutineType]:
+        self,
+        base: SharedImage,
+        n: int,
+        product_name: str,
+        on_upload: Optional[Callable[[str], None]] = None,
+        avoid_hashes: Iterable[PerceptualHash] = (),
+    ) -> List[UploadedBanner]:
         """
         Uploads bytes to S3
         Args:
-            bytes: img bytes
+            base: shared base banner
             n: number of variants
+            on_upload: called with a label after each variant upload
+            avoid_hashes: perceptual hashes of the product's existing variants
         Returns:
-            list of urls
+            list of uploaded variants
         """
 
-        variants = await self._generate_variant(base_img=base_img, num_var=n)
+        variants = await self._generate_variant(
+            base=base, num_var=n, avoid_hashes=avoid_hashes
+        )
         s3 = self.s3_factory()
-        s3_urls = [
-            s3.upload_byte(byte, name=f"{product_name}_{i}")
-            for i, byte in enumerate(variants)
-        ]
+
+        async def upload(i: int, encoded: EncodedImage) -> UploadedBanner:
+            banner = await self._upload_encoded(
+                s3, encoded, name=f"{product_name}_{i}", platform="Facebook"
+            )
+            banner.variant_number = i
+            if on_upload:
+                on_upload(f"Variant {i}")
+            return banner
+
+        s3_urls = []
+        for i, encoded in enumerate(variants):
+            if isinstance(encoded, BaseException):
+                self.logger.error(f"Variant {i} failed: {encoded}")
+                continue
+            s3_urls.append(upload(i, encoded))
 
         return await asyncio.gather(*s3_urls)
 
+    async def _create_upload_renditions(
+        self,
+        base: SharedImage,
+        platforms: List[str],
+        product_name: str,
+        on_upload: Optional[Callable[[str], None]] = None,
+    ) -> Dict[str, UploadedBanner]:
+        """
+        Render the base banner at every platform size and upload each
+        Args:
+            base: shared base banner
+            platforms: rendition_service.PLATFORM_SIZES keys
+            on_upload: called with a label after each rendition upload
+        Returns:
+            upload per platform, platforms that failed to render are left out
+        """
+
+        renditions = await self.rendition_service.generate_renditions(base, platforms)
+        s3 = self.s3_factory()
+
+        async def upload(
+            platform: str, encoded: EncodedImage
+        ) -> Tuple[str, UploadedBanner]:
+            banner = await self._upload_encoded(
+                s3, encoded, name=f"{product_name}_{platform}", platform=platform
+            )
+            banner.variant_number = platforms.index(platform)
+            banner.platform = platform
+            if on_upload:
+                on_upload(f"Rendition {platform}")
+            return platform, banner
+
+        uploads = []
+        for platform, encoded in renditions.items():
+            if isinstance(encoded, BaseException):
+                self.logger.error(f"{platform} rendition failed: {encoded}")
+                continue
+            uploads.append(upload(platform, encoded))
+
+        return dict(await asyncio.gather(*uploads))
+
+    async def _upload_encoded(
+        self, s3: S3Service, encoded: EncodedImage, name: str, platform: str
+    ) -> UploadedBanner:
+        """Upload an encoded banner and its preview thumbnail side by side"""
+
+        url, preview_url = await asyncio.gather(
+            s3.upload_byte(
+                encoded.data,
+                name=name,
+                platform=platform,
+                extension=encoded.profile.extension,
+                content_type=encoded.profile.content_type,
+            ),
+            s3.upload_byte(
+                encoded.preview,
+                name=name,
+                platform=platform,
+                prefix="banner_previews",
+                extension=encoded.preview_extension,
+                content_type=encoded.preview_content_type,
+            ),
+        )
+        return UploadedBanner(
+            url=url,
+            preview_url=preview_url,
+            file_size=len(encoded.data),
+            preview_size=len(encoded.preview),
+            phash=encoded.phash,
+            color_hash=encoded.color_hash,
+        )
+
+    async def get_renditions(self, product_id: int) -> Dict[str, str]:
+        """Latest rendition url per platform saved for the product"""
+
+        result = await self.db.execute(
+            select(BannerVariant.platform, BannerVariant.s3_url)
+            .where(
+                BannerVariant.product_id == product_id,
+                BannerVariant.platform.is_not(None),
+            )
+            .order_by(BannerVariant.id.desc())
+        )
+        renditions: Dict[str, str] = {}
+        for platform, url in result:
+            renditions.setdefault(platform, url)
+        return renditions
+
+    async def _existing_variant_hashes(
+        self, product_id: Optional[int]
+    ) -> List[PerceptualHash]:
+        """
+        Perceptual hashes of the style variants already saved for the product,
+        none unless VARIANT_DEDUPE_AGAINST_EXISTING is set
+        """
+
+        if product_id is None or not get_settings().VARIANT_DEDUPE_AGAINST_EXISTING:
+            return []
+        result = await self.db.execute(
+            select(BannerVariant.phash, BannerVariant.color_hash).where(
+                BannerVariant.product_id == int(product_id),
+                BannerVariant.platform.is_(None),
+                BannerVariant.phash.is_not(None),
+                BannerVariant.color_hash.is_not(None),
+            )
+        )
+        return [tuple(row) for row in result]
+
     # def _generate_variations(self, banner: bytes, num_var: int):
     #     """
     #     Generate variations based on the img.
@@ -259,61 +510,94 @@ class BannerService:
             self.logger.error(f"Unexpected error while saving product: {str(e)}")
             raise
 
-    def _get_img_from(self, response, in_mem=True):
+    def _get_img_from(self, response, in_mem=True) -> Optional[GeneratedImage]:
+        """
+        Image part of a Gemini response, kept in the format the model sent.
+        Decoding is left to the consumer so it happens exactly once.
+        """
         for part in response.candidates[0].content.parts:
             if part.text is not None:
                 print(part.text)
             elif part.inline_data is not None:
-                image = Image.open(BytesIO((part.inline_data.data)))
+                generated = GeneratedImage(
+                    data=part.inline_data.data,
+                    mime_type=part.inline_data.mime_type or "image/png",
+                )
                 if in_mem:
-                    import io
-
-                    in_mem_file = io.BytesIO()
-                    image.save(in_mem_file, format="png")
-                    return in_mem_file.getvalue()
+                    return generated
 
                 elif not in_mem:
+                    image = generated.decode()
                     image.save("gemini-native-image.png")
                     image.show()
 
-    async def _save_banner_link(
-        self, s3_url: str, product_id: int, variant_num: int, db_session
-    ) -> BannerVariant:
-        """Save banner variant s3 url to db"""
+    async def save_banner_variants(
+        self, product_id: int, banners: List[UploadedBanner]
+    ) -> List[int]:
+        """
+        Save every banner of a generation in one transaction
+        Args:
+            product_id: product the banners belong to
+            banners: uploaded style variants and renditions
+        Returns:
+            ids of the inserted banner_variants rows, in the order of `banners`
+        """
+
+        if not banners:
+            return []
 
         try:
-            save_s3_url: str = s3_url
-            s3_key = save_s3_url.split(".amazonaws.com/")[-1] if save_s3_url else None
             product_id = int(product_id)
-
-            product = await db_session.get(Product, product_id)
-
-            banner_variant = BannerVariant(
-                variant_number=variant_num,
-                s3_url=save_s3_url,
-                s3_key=s3_key,
-                status="completed",  # Set initial status as completed since we have the URL
-                generation_time=0.0,  # You can update this if you track generation time
-                view_count=0,
-                is_selected=False,
-                is_downloaded=False,
+            if await self.db.get(Product, product_id) is None:
+                raise InvalidProductInfoError(f"Product {product_id} does not exist.")
+
+            # one multi-row INSERT ... RETURNING instead of a commit per row
+            result = await self.db.execute(
+                insert(BannerVariant).returning(
+                    BannerVariant.id, sort_by_parameter_order=True
+                ),
+                [self._banner_variant_row(product_id, banner) for banner in banners],
             )
-
-            banner_variant.product = product
-            db_session.add(banner_variant)
-            await db_session.commit()
-            await db_session.refresh(banner_variant)
+            ids = list(result.scalars())
+            await self.db.commit()
 
             self.logger.info(
-                f"Successfully saved banner variant with ID: {banner_variant.id}"
+                f"Saved {len(ids)} banner variants for product {product_id}"
             )
-            return banner_variant
+            return ids
 
         except SQLAlchemyError as e:
             await self.db.rollback()
-            self.logger.error(f"Database error while saving banner variant: {str(e)}")
+            self.logger.error(f"Database error while saving banner variants: {str(e)}")
             raise
         except Exception as e:
             await self.db.rollback()
-            self.logger.error(f"Unexpected error while saving banner variant: {str(e)}")
+            self.logger.error(
+                f"Unexpected error while saving banner variants: {str(e)}"
+            )
             raise
+
+    def _banner_variant_row(self, product_id: int, banner: UploadedBanner) -> dict:
+        """banner_variants column values of an uploaded banner"""
+
+        def s3_key(url: Optional[str]) -> Optional[str]:
+            return url.split(".amazonaws.com/")[-1] if url else None
+
+        return {
+            "product_id": product_id,
+            "variant_number": banner.variant_number,
+            "platform": banner.platform,
+            "s3_url": banner.url,
+            "s3_key": s3_key(banner.url),
+            "s3_preview_url": banner.preview_url,
+            "s3_preview_key": s3_key(banner.preview_url),
+            "file_size": banner.file_size,
+            "preview_size": banner.preview_size,
+            "status": banner.status,
+            "generation_time": banner.generation_time,
+            "phash": banner.phash,
+            "color_hash": banner.color_hash,
+            "view_count": 0,
+            "is_selected": False,
+            "is_downloaded": False,
+        }
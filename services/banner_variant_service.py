@@ -1,13 +1,21 @@
-import asyncio
-import io
 import random
-from types import CoroutineType
-from typing import List
-from PIL import Image, ImageEnhance, ImageFilter
+from typing import Iterable, List, Set, Tuple, Union
+from PIL import Image
+
+from config.env_variables import get_settings
+from core.utils.logger import Logger
+from services.image_encoding import EncodedImage
+from services.perceptual_hash import PerceptualHash, is_near_duplicate
+from services.variant_enhancer import enhance_image
+from services.variant_renderer import SharedImage, get_variant_renderer
+
+# relative spread of brightness / contrast / saturation for a non zero seed
+STYLE_JITTER = 0.15
 
 
 class BannerVariantService:
     def __init__(self):
+        self.logger = Logger.get_logger(__name__)
         self.style_variations = {"subtle", "vibrant", "muted"}
         self.variation_dict = {
             "subtle": {
@@ -34,38 +42,111 @@ class BannerVariantService:
         }
         self.layout_variations = {}
 
-    def generate_variants(self, base_img: bytes, num_variant: int = 3) -> CoroutineType:
-        base_pil = Image.open(io.BytesIO(base_img))
+    async def generate_variants(
+        self,
+        base: SharedImage,
+        num_variant: int = 3,
+        avoid_hashes: Iterable[PerceptualHash] = (),
+    ) -> List[Union[EncodedImage, BaseException]]:
+        """
+        Render style variants of the base banner in the variant process pool.
+        Every variant gets its own (style, seed). A variant whose layout and
+        colours (perceptual_hash) match a sibling or `avoid_hashes` is
+        regenerated with a fresh seed in "regenerate" mode, up to
+        VARIANT_DEDUPE_MAX_ATTEMPTS rounds, after which the closest repeats
+        are kept so num_variant results come back. "reject" mode drops them.
+        Args:
+            base: shared base banner from VariantRenderer.share()
+            num_variant: number of variants
+            avoid_hashes: perceptual hashes of banners the product already has
+        Returns:
+            encoded variant with preview, or the exception that variant raised
+        """
+        settings = get_settings()
+        renderer = get_variant_renderer()
 
-        async def generate_var():
-            style = random.choice(list(self.style_variations))
-            seed = random.random()
+        # every preset once before any repeats, repeats are jittered
+        presets = list(self.style_variations)
+        styles = [
+            (style, 0.0)
+            for style in random.sample(presets, min(num_variant, len(presets)))
+        ]
+        used = {style for style, _ in styles}
+        styles += [self._fresh_style(used) for _ in range(num_variant - len(styles))]
 
-            enhanced = self._enhance_img(base_pil, style, seed)
+        results = await renderer.render(base, styles)
+        if settings.VARIANT_DEDUPE_MODE == "off":
+            return results
 
-            buffer = io.BytesIO()
-            enhanced.save(buffer, format="PNG")
-            return buffer.getvalue()
+        attempts = (
+            settings.VARIANT_DEDUPE_MAX_ATTEMPTS
+            if settings.VARIANT_DEDUPE_MODE == "regenerate"
+            else 0
+        )
+        known = list(avoid_hashes)
+        accepted: List[Union[EncodedImage, BaseException]] = []
+        for attempt in range(attempts + 1):
+            duplicates: List[EncodedImage] = []
+            for result in results:
+                if isinstance(result, BaseException) or result.phash is None:
+                    accepted.append(result)
+                elif is_near_duplicate(
+                    (result.phash, result.color_hash),
+                    known,
+                    settings.VARIANT_DEDUPE_MAX_DISTANCE,
+                    settings.VARIANT_DEDUPE_MAX_COLOR_DISTANCE,
+                ):
+                    duplicates.append(result)
+                else:
+                    accepted.append(result)
+                    known.append((result.phash, result.color_hash))
 
-        return [asyncio.create_task(generate_var()) for _ in range(num_variant)]
+            if not duplicates:
+                break
+            if attempt == attempts:
+                if settings.VARIANT_DEDUPE_MODE == "regenerate":
+                    # out of attempts, repeats beat returning fewer variants
+                    self.logger.info(f"Kept {len(duplicates)} near-duplicate variants")
+                    accepted += duplicates
+                else:
+                    self.logger.info(
+                        f"Dropped {len(duplicates)} near-duplicate variants"
+                    )
+                break
 
-    def _enhance_img(self, base_pil: Image.Image, style, seed):
-        """enhance image while preserving original content"""
+            results = await renderer.render(
+                base, [self._fresh_style(used) for _ in duplicates]
+            )
 
-        params = self._get_style_params(style)
-        enhanced = base_pil.copy()
+        return accepted
 
-        enhanced = ImageEnhance.Brightness(enhanced).enhance(params["brightness"])
-        enhanced = ImageEnhance.Contrast(enhanced).enhance(params["contrast"])
-        enhanced = ImageEnhance.Color(enhanced).enhance(params["saturation"])
+    def _fresh_style(self, used: Set[str]) -> Tuple[str, float]:
+        """An unused preset, or a jittered random preset once all are used"""
+        unused = [style for style in self.style_variations if style not in used]
+        if unused:
+            style = random.choice(unused)
+            used.add(style)
+            return style, 0.0
+        # random() is in [0, 1), keep the seed away from 0 which means no jitter
+        return random.choice(list(self.style_variations)), 1.0 - random.random()
+
+    def _enhance_img(self, base_pil: Image.Image, style, seed):
+        """enhance image while preserving original content"""
 
-        if params["sharpness"] > 0:
-            enhanced = ImageEnhance.Sharpness(enhanced).enhance(params["sharpness"])
+        params = self._jitter(self._get_style_params(style), seed)
+        return enhance_image(base_pil, params)
 
-        if params["smoothness"] > 0:
-            enhanced = enhanced.filter(ImageFilter.GaussianBlur(params["smoothness"]))
+    def _jitter(self, params: dict, seed: float) -> dict:
+        """Deterministically vary a preset's colour factors, seed 0 keeps it"""
+        if not seed:
+            return params
 
-        return enhanced
+        rng = random.Random(seed)
+        jittered = dict(params)
+        for name in ("brightness", "contrast", "saturation"):
+            spread = rng.uniform(-STYLE_JITTER, STYLE_JITTER)
+            jittered[name] = params[name] * (1 + spread)
+        return jittered
 
     def _get_style_params(self, style):
         """returns random variant style"""
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from config.db_config import AsyncSessionLocal
+from config.env_variables import get_settings
+from core.agent.product_agent import ProductAgent
+from core.model.scheduler import Priority, model_call_priority
+from core.utils.logger import Logger
+from services.banner_service import BannerService
+from services.banner_variant_service import BannerVariantService
+from services.crawl_cache_service import get_crawl_cache
+from services.s3_service import S3Service
+from utils.url import canonicalize_url
+
+
+class DomainThrottle:
+    """Caps concurrent crawls per domain and spaces out their start times"""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.concurrency = concurrency
+        self.delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, domain: str):
+        semaphore = self._semaphores.setdefault(
+            domain, asyncio.Semaphore(self.concurrency)
+        )
+        async with semaphore:
+            # reserve the next start time before sleeping so concurrent
+            # crawls of the same domain queue up behind each other
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start_at = max(now, self._next_start.get(domain, now))
+            self._next_start[domain] = start_at + self.delay
+
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+            yield
+
+
+class BulkCrawlService:
+    """
+    Crawls many product urls concurrently with a global cap shared by every
+    batch, per-domain caps and politeness delays.
+    """
+
+    def __init__(self, concurrency: int, per_domain_concurrency: int, delay: float):
+        self.logger = Logger.get_logger(__name__)
+        self._global = asyncio.Semaphore(concurrency)
+        self._throttle = DomainThrottle(per_domain_concurrency, delay)
+
+    async def crawl(
+        self, urls: List[str], force_refresh: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Crawl urls and yield one result per url as soon as it completes.
+        Args:
+            urls: product page urls, duplicates are crawled once
+            force_refresh: bypass the crawl cache
+        Returns:
+            async iterator of {url, success, result | error, elapsed}
+        """
+        tasks = [
+            asyncio.create_task(self._crawl_one(url, force_refresh))
+            for url in dict.fromkeys(urls)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # client went away or the batch failed, stop the remaining crawls
+            for task in tasks:
+                task.cancel()
+
+    async def _crawl_one(self, url: str, force_refresh: bool) -> Dict[str, Any]:
+        started = time.monotonic()
+        # each url runs in its own task, so this only affects this crawl
+        model_call_priority.set(Priority.BULK)
+        try:
+            # cache hits never wait for crawl capacity, the lookup session is
+            # closed before waiting so queued urls hold no pooled connection
+            if not force_refresh:
+                async with AsyncSessionLocal() as db:
+                    cached = await get_crawl_cache().get(db, url)
+                if cached is not None:
+                    return self._result(url, started, result=cached)
+
+            domain = urlsplit(canonicalize_url(url)).hostname or ""
+            # domain first, so urls queued behind one slow domain do not
+            # hold global slots other domains could use
+            async with self._throttle.slot(domain), self._global:
+                async with AsyncSessionLocal() as db:
+                    banner_service = BannerService(
+                        db, s3_fact=S3Service, variation_service=BannerVariantService()
+                    )
+                    result = await banner_service.get_product_info(
+                        url, ProductAgent(), force_refresh=True
+                    )
+            return self._result(url, started, result=result)
+
+        except Exception as e:
+            self.logger.error(f"Bulk crawl failed for {url}: {e}")
+            return self._result(url, started, error=str(e))
+
+    @staticmethod
+    def _result(
+        url: str, started: float, result: Any = None, error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return {
+            "url": url,
+            "success": error is None,
+            "result": result,
+            "error": error,
+            "elapsed": round(time.monotonic() - started, 3),
+        }
+
+
+_bulk_crawl_service: Optional[BulkCrawlService] = None
+
+
+def get_bulk_crawl_service() -> BulkCrawlService:
+    """
+    Get the process-wide bulk crawl service.
+    """
+    global _bulk_crawl_service
+
+    if _bulk_crawl_service is None:
+        settings = get_settings()
+        _bulk_crawl_service = BulkCrawlService(
+            concurrency=settings.BULK_CRAWL_CONCURRENCY,
+            per_domain_concurrency=settings.BULK_CRAWL_PER_DOMAIN_CONCURRENCY,
+            delay=settings.BULK_CRAWL_POLITENESS_DELAY,
+        )
+    return _bulk_crawl_service
@@ -0,0 +1,156 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.env_variables import get_settings
+from core.utils.logger import Logger
+from models.crawl_cache_model import CrawlCacheEntry
+from utils.url import canonicalize_url
+
+
+@dataclass
+class CrawlCacheStats:
+    memory_hits: int = 0
+    db_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_rate": (
+                (self.memory_hits + self.db_hits) / lookups if lookups else 0.0
+            ),
+        }
+
+
+class CrawlCache:
+    """
+    Two tier cache of crawl responses keyed by canonical product url.
+    An in-process LRU sits in front of the crawl_cache postgres table.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.logger = Logger.get_logger(__name__)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = CrawlCacheStats()
+        # canonical url -> (expires at unix time, payload)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return payload
+
+    def _memory_set(self, key: str, payload: Dict[str, Any], expires_at: float):
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, db: AsyncSession, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached crawl response.
+        Args:
+            db: session used for the postgres tier
+            url: product url, canonicalized before lookup
+        Returns:
+            cached response or None on miss / expiry
+        """
+        key = canonicalize_url(url)
+
+        payload = self._memory_get(key)
+        if payload is not None:
+            self.stats.memory_hits += 1
+            return payload
+
+        try:
+            entry = await db.scalar(
+                select(CrawlCacheEntry).where(
+                    CrawlCacheEntry.canonical_url == key,
+                    CrawlCacheEntry.expires_at > datetime.now(timezone.utc),
+                )
+            )
+        except Exception as e:
+            # leave the shared session usable for the crawl and set()
+            await db.rollback()
+            self.logger.error(f"Crawl cache lookup failed for {key}: {e}")
+            entry = None
+
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.db_hits += 1
+        self._memory_set(key, entry.payload, entry.expires_at.timestamp())
+        return entry.payload
+
+    async def set(
+        self,
+        db: AsyncSession,
+        url: str,
+        payload: Dict[str, Any],
+        product_id: Optional[int] = None,
+    ):
+        """Store a crawl response in both tiers, replacing any previous entry."""
+        key = canonicalize_url(url)
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+
+        self._memory_set(key, payload, expires_at.timestamp())
+        self.stats.stores += 1
+
+        values = {
+            "canonical_url": key,
+            "product_id": product_id,
+            "payload": payload,
+            "expires_at": expires_at,
+        }
+        try:
+            await db.execute(
+                insert(CrawlCacheEntry)
+                .values(**values)
+                .on_conflict_do_update(
+                    index_elements=[CrawlCacheEntry.canonical_url],
+                    set_={k: v for k, v in values.items() if k != "canonical_url"},
+                )
+            )
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            self.logger.error(f"Failed to persist crawl cache entry for {key}: {e}")
+
+
+_crawl_cache: Optional[CrawlCache] = None
+
+
+def get_crawl_cache() -> CrawlCache:
+    """
+    Get the process-wide crawl cache.
+    """
+    global _crawl_cache
+
+    if _crawl_cache is None:
+        settings = get_settings()
+        _crawl_cache = CrawlCache(
+            max_entries=settings.CRAWL_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.CRAWL_CACHE_TTL_SECONDS,
+        )
+    return _crawl_cache
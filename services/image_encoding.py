@@ -0,0 +1,161 @@
+import io
+from dataclasses import dataclass, field, replace
+from typing import Dict, Optional
+from PIL import Image, features
+
+from config.env_variables import get_settings
+
+# PIL format -> (content type, file extension)
+FORMATS = {
+    "AVIF": ("image/avif", "avif"),
+    "WEBP": ("image/webp", "webp"),
+    "JPEG": ("image/jpeg", "jpg"),
+    "PNG": ("image/png", "png"),
+}
+
+# profile of style variants, which have no platform
+DEFAULT_PROFILE_KEY = "default"
+
+
+@dataclass(frozen=True)
+class EncodingProfile:
+    format: str = "WEBP"
+    quality: int = 85
+    preview_width: int = 320
+    preview_quality: int = 70
+
+    @property
+    def content_type(self) -> str:
+        return FORMATS[self.format][0]
+
+    @property
+    def extension(self) -> str:
+        return FORMATS[self.format][1]
+
+
+# style variants are served to our own clients, platform renditions are
+# uploaded to networks that re-encode anything but JPEG
+DEFAULT_ENCODING_PROFILES: Dict[str, EncodingProfile] = {
+    DEFAULT_PROFILE_KEY: EncodingProfile(format="WEBP", quality=85),
+    "facebook_feed": EncodingProfile(format="JPEG", quality=88),
+    "instagram_square": EncodingProfile(format="JPEG", quality=90),
+    "instagram_story": EncodingProfile(format="JPEG", quality=90),
+    "whatsapp": EncodingProfile(format="JPEG", quality=80),
+}
+
+
+@dataclass
+class GeneratedImage:
+    """
+    Image payload as the model returned it plus its one decode.
+    The raw bytes are kept as is, nothing re-encodes them to change format.
+    """
+
+    data: bytes
+    mime_type: str = "image/png"
+    _image: Optional[Image.Image] = field(default=None, repr=False)
+
+    def decode(self) -> Image.Image:
+        """Decoded image, decoded on first use only"""
+        if self._image is None:
+            # BytesIO over a bytes object shares its buffer instead of copying
+            image = Image.open(io.BytesIO(self.data))
+            image.load()
+            self._image = image
+        return self._image
+
+
+@dataclass
+class EncodedImage:
+    data: bytes
+    preview: bytes
+    profile: EncodingProfile
+    # perceptual_hash.dhash and color_signature of the rendered image
+    phash: Optional[int] = None
+    color_hash: Optional[int] = None
+
+    @property
+    def preview_content_type(self) -> str:
+        return FORMATS[_preview_format()][0]
+
+    @property
+    def preview_extension(self) -> str:
+        return FORMATS[_preview_format()][1]
+
+
+def _supported(image_format: str) -> bool:
+    if image_format == "AVIF":
+        return features.check("avif")
+    if image_format == "WEBP":
+        return features.check("webp")
+    return image_format in FORMATS
+
+
+def _preview_format() -> str:
+    return "WEBP" if _supported("WEBP") else "JPEG"
+
+
+def encoding_profile(platform: Optional[str] = None) -> EncodingProfile:
+    """
+    Output encoding of a banner.
+    Args:
+        platform: rendition_service.PLATFORM_SIZES key, None for style variants
+    Returns:
+        profile with BANNER_ENCODING_PROFILES overrides applied, formats this
+        Pillow build cannot write fall back to WebP, then PNG
+    """
+    key = platform if platform in DEFAULT_ENCODING_PROFILES else DEFAULT_PROFILE_KEY
+    profile = DEFAULT_ENCODING_PROFILES[key]
+
+    overrides = get_settings().BANNER_ENCODING_PROFILES
+    for name in (DEFAULT_PROFILE_KEY, platform):
+        if name in overrides:
+            profile = replace(profile, **overrides[name])
+
+    image_format = profile.format.upper()
+    if not _supported(image_format):
+        image_format = "WEBP" if _supported("WEBP") else "PNG"
+    return replace(profile, format=image_format)
+
+
+def _save(image: Image.Image, image_format: str, quality: int) -> bytes:
+    if image_format == "JPEG" and image.mode != "RGB":
+        # JPEG has no alpha, flatten onto white rather than black
+        flattened = Image.new("RGB", image.size, (255, 255, 255))
+        flattened.paste(
+            image, mask=image.getchannel("A") if "A" in image.mode else None
+        )
+        image = flattened
+
+    options = {
+        "AVIF": {"quality": quality},
+        "WEBP": {"quality": quality, "method": 4},
+        "JPEG": {"quality": quality, "optimize": True, "progressive": True},
+        "PNG": {"optimize": True},
+    }[image_format]
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+
+def encode_image(image: Image.Image, profile: EncodingProfile) -> EncodedImage:
+    """
+    Encode a rendered banner and its preview thumbnail.
+    Args:
+        image: rendered banner
+        profile: from encoding_profile()
+    Returns:
+        full size bytes in the profile format and a preview_width wide preview
+    """
+    width = min(profile.preview_width, image.width)
+    height = max(1, round(image.height * width / image.width))
+    thumbnail = image.resize(
+        (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0
+    )
+
+    return EncodedImage(
+        data=_save(image, profile.format, profile.quality),
+        preview=_save(thumbnail, _preview_format(), profile.preview_quality),
+        profile=profile,
+    )
@@ -0,0 +1,127 @@
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from config.env_variables import get_settings
+from core.utils.logger import Logger
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    kind: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    progress: float = 0.0
+    message: str = ""
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def as_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status.value,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JobStore:
+    """
+    In-process registry of background jobs.
+    Finished jobs are kept for `ttl_seconds` so clients can read the result,
+    subscribers receive a snapshot of the job on every update.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.logger = Logger.get_logger(__name__)
+        self.ttl_seconds = ttl_seconds
+        self._jobs: Dict[str, Job] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def create(self, kind: str) -> Job:
+        self._evict_expired()
+        job = Job(kind=kind)
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def update(self, job: Job, **changes) -> Job:
+        """Apply field changes to a job and bump its updated_at."""
+        for name, value in changes.items():
+            setattr(job, name, value)
+        job.updated_at = time.time()
+
+        snapshot = job.as_dict()
+        for queue in self._subscribers.get(job.id, []):
+            queue.put_nowait(snapshot)
+        return job
+
+    def subscribe(self, job: Job) -> asyncio.Queue:
+        """Queue of job snapshots, starting with the current state."""
+        queue = asyncio.Queue()
+        queue.put_nowait(job.as_dict())
+        self._subscribers.setdefault(job.id, []).append(queue)
+        return queue
+
+    def unsubscribe(self, job: Job, queue: asyncio.Queue):
+        queues = self._subscribers.get(job.id, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self._subscribers.pop(job.id, None)
+
+    def fail(self, job: Job, error: str) -> Job:
+        self.logger.error(f"{job.kind} job {job.id} failed: {error}")
+        return self.update(job, status=JobStatus.FAILED, error=error)
+
+    def _evict_expired(self):
+        expire_before = time.time() - self.ttl_seconds
+        for job_id in [
+            job.id
+            for job in self._jobs.values()
+            if job.finished and job.updated_at < expire_before
+        ]:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict:
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return counts
+
+
+_job_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    """
+    Get the process-wide background job store.
+    """
+    global _job_store
+
+    if _job_store is None:
+        _job_store = JobStore(ttl_seconds=get_settings().JOB_TTL_SECONDS)
+    return _job_store
@@ -0,0 +1,124 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.db_config import AsyncSessionLocal
+from config.env_variables import get_settings
+from core.utils.logger import Logger
+from exceptions.job_queue_full_error import JobQueueFullError
+from services.banner_service import BannerService
+from services.banner_variant_service import BannerVariantService
+from services.job_store import Job, JobStatus, JobStore, get_job_store
+from services.s3_service import S3Service
+
+OG_BANNER_JOB_KIND = "og_banner"
+
+
+class OgBannerJobQueue:
+    """
+    Runs OG banner generation as background jobs.
+
+    Requests only enqueue the product info, a fixed pool of workers drains a
+    bounded queue so a burst of requests cannot start unbounded generations,
+    and each worker reports its steps through the job store.
+    """
+
+    def __init__(self, job_store: JobStore, workers: int, max_queued: int):
+        self.logger = Logger.get_logger(__name__)
+        self.job_store = job_store
+        self.workers = workers
+        self._queue: asyncio.Queue[Tuple[Job, Dict[str, Any]]] = asyncio.Queue(
+            maxsize=max_queued
+        )
+        self._workers: List[asyncio.Task] = []
+        self._active = 0
+
+    def submit(self, product_info: Dict[str, Any]) -> Job:
+        """
+        Queue an OG banner generation.
+        Args:
+            product_info: CreateOGBannerRequest product info
+        Returns:
+            job to follow through get_job_store()
+        """
+        if self._queue.full():
+            raise JobQueueFullError(
+                f"{self._queue.qsize()} OG banner jobs already waiting"
+            )
+
+        self._start_workers()
+        job = self.job_store.create(OG_BANNER_JOB_KIND)
+        self._queue.put_nowait((job, product_info))
+        return job
+
+    def _start_workers(self):
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self.workers:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _worker(self):
+        while True:
+            job, product_info = await self._queue.get()
+            self._active += 1
+            try:
+                await self._run(job, product_info)
+            finally:
+                self._active -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: Job, product_info: Dict[str, Any]):
+        self.job_store.update(job, status=JobStatus.RUNNING, message="Generating")
+
+        def report(message: str, fraction: float):
+            self.job_store.update(job, message=message, progress=min(fraction, 0.99))
+
+        try:
+            async with AsyncSessionLocal() as db:
+                banner = BannerService(
+                    db, s3_fact=S3Service, variation_service=BannerVariantService()
+                )
+                banners = await banner.generate_og_banners(
+                    progress=report, **product_info
+                )
+        except Exception as e:
+            self.job_store.fail(job, str(e))
+            return
+
+        self.job_store.update(
+            job,
+            status=JobStatus.SUCCEEDED,
+            progress=1.0,
+            message="Banners ready",
+            result=banners,
+        )
+
+    async def stop(self):
+        """Cancel the workers on shutdown, queued jobs are dropped."""
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "running": self._active,
+            "workers": len(self._workers),
+        }
+
+
+_og_banner_job_queue: Optional[OgBannerJobQueue] = None
+
+
+def get_og_banner_job_queue() -> OgBannerJobQueue:
+    """
+    Get the process-wide OG banner job queue.
+    """
+    global _og_banner_job_queue
+
+    if _og_banner_job_queue is None:
+        settings = get_settings()
+        _og_banner_job_queue = OgBannerJobQueue(
+            job_store=get_job_store(),
+            workers=settings.OG_BANNER_WORKERS,
+            max_queued=settings.OG_BANNER_QUEUE_SIZE,
+        )
+    return _og_banner_job_queue
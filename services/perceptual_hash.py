@@ -0,0 +1,86 @@
+from typing import Iterable, Tuple
+import numpy as np
+from PIL import Image, ImageStat
+
+# 8 rows of 8 left/right comparisons, one 64 bit hash
+HASH_SIZE = 8
+
+# colour signature: mean and standard deviation of each RGB channel
+COLOR_BITS = 8
+COLOR_VALUES = 6
+
+# (dhash, color_signature) of an image
+PerceptualHash = Tuple[int, int]
+
+
+def _signed(value: int) -> int:
+    """Unsigned 64 bit value as a signed one, the range of a postgres BIGINT"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def dhash(image: Image.Image) -> int:
+    """
+    Difference hash of an image.
+    The image is box-downsampled to 9x8 grey cells and every bit records
+    whether a cell is brighter than its right neighbour, so re-encoding,
+    resizing and small edits leave the hash (nearly) unchanged.
+    Returns:
+        hash as a signed 64 bit integer, the range of a postgres BIGINT
+    """
+    cells = np.asarray(
+        image.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BOX).convert("L"),
+        dtype=np.int16,
+    )
+    bits = (cells[:, 1:] > cells[:, :-1]).flatten()
+    value = int.from_bytes(np.packbits(bits).tobytes(), "big")
+    return _signed(value)
+
+
+def color_signature(image: Image.Image) -> int:
+    """
+    Tone and colour of an image, the part dhash is blind to.
+    Mean and standard deviation of every RGB channel, one byte each, so
+    brightness, saturation (means) and contrast (deviations) move the
+    signature by several levels where re-encoding moves it by a few.
+    Returns:
+        48 bit signature
+    """
+    stat = ImageStat.Stat(image.convert("RGB"))
+    value = 0
+    for level in [*stat.mean, *stat.stddev]:
+        value = value << COLOR_BITS | min(255, round(level))
+    return value
+
+
+def perceptual_hash(image: Image.Image) -> PerceptualHash:
+    """Layout and colour hash of a rendered banner"""
+    return dhash(image), color_signature(image)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits of two signed 64 bit hashes"""
+    return ((a ^ b) & ((1 << 64) - 1)).bit_count()
+
+
+def color_distance(a: int, b: int) -> int:
+    """Largest difference of two colour signatures' values, in levels"""
+    mask = (1 << COLOR_BITS) - 1
+    return max(
+        abs((a >> shift & mask) - (b >> shift & mask))
+        for shift in range(0, COLOR_VALUES * COLOR_BITS, COLOR_BITS)
+    )
+
+
+def is_near_duplicate(
+    value: PerceptualHash,
+    others: Iterable[PerceptualHash],
+    max_distance: int,
+    max_color_distance: int,
+) -> bool:
+    """Same layout (dhash) and same colours (colour signature) as any of others"""
+    structure, color = value
+    return any(
+        hamming_distance(structure, other_structure) <= max_distance
+        and color_distance(color, other_color) <= max_color_distance
+        for other_structure, other_color in others
+    )
@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional, Tuple, Union
+import numpy as np
+from PIL import Image, ImageFilter, ImageStat
+
+from services.image_encoding import EncodedImage
+from services.variant_renderer import SharedImage, get_variant_renderer
+
+# output size per platform asset
+PLATFORM_SIZES: Dict[str, Tuple[int, int]] = {
+    "facebook_feed": (1200, 628),
+    "instagram_square": (1080, 1080),
+    "instagram_story": (1080, 1920),
+    "whatsapp": (800, 800),
+}
+
+# ProductBase platform / target_platform values -> renditions
+PLATFORM_RENDITIONS: Dict[str, List[str]] = {
+    "facebook": ["facebook_feed"],
+    "instagram": ["instagram_square", "instagram_story"],
+    "whatsapp": ["whatsapp"],
+}
+
+# crop at most this share of the long side away, pad for the rest
+MAX_CROP = 0.25
+# long side of the image saliency is computed on
+SALIENCY_SIZE = 128
+
+
+def platforms_for(*requested: Optional[str]) -> List[str]:
+    """
+    Renditions for the platform / target_platform of a product, every
+    platform size when none is requested or none is known.
+    """
+    renditions: List[str] = []
+    for value in requested:
+        for name in (value or "").lower().replace(",", " ").split():
+            for rendition in PLATFORM_RENDITIONS.get(
+                name, [name] if name in PLATFORM_SIZES else []
+            ):
+                if rendition not in renditions:
+                    renditions.append(rendition)
+    return renditions or list(PLATFORM_SIZES)
+
+
+def _saliency_profile(image: Image.Image, axis: int) -> np.ndarray:
+    """
+    Edge energy summed across `axis` on a downsampled copy, one value per
+    SALIENCY_SIZE-scaled column (axis=0) or row (axis=1).
+    """
+    scale = SALIENCY_SIZE / max(image.size)
+    small = image.convert("L").resize(
+        (max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+        Image.Resampling.BILINEAR,
+    )
+    edges = np.asarray(small.filter(ImageFilter.FIND_EDGES), dtype=np.float32)
+    # a little uniform weight keeps flat banners centred
+    return edges.sum(axis=axis) + edges.mean() * edges.shape[axis] * 0.1
+
+
+def _crop_window(profile: np.ndarray, length: float, total: int) -> float:
+    """Start of the `length` long window (in pixels of `total`) with most energy"""
+    scale = len(profile) / total
+    window = max(1, min(len(profile), round(length * scale)))
+    sums = np.convolve(profile, np.ones(window), mode="valid")
+    start = int(np.argmax(sums)) / scale
+    return min(max(0.0, start), total - length)
+
+
+def _crop_box(
+    image: Image.Image, target: Tuple[int, int]
+) -> Tuple[float, float, float, float]:
+    """Source box to keep: the most salient window, cropping at most MAX_CROP"""
+    width, height = image.size
+    target_aspect = target[0] / target[1]
+
+    if width / height > target_aspect:
+        keep = max(height * target_aspect, width * (1 - MAX_CROP))
+        left = _crop_window(_saliency_profile(image, axis=0), keep, width)
+        return (left, 0, left + keep, height)
+
+    keep = max(width / target_aspect, height * (1 - MAX_CROP))
+    top = _crop_window(_saliency_profile(image, axis=1), keep, height)
+    return (0, top, width, top + keep)
+
+
+def _background(image: Image.Image, box: Tuple[float, float, float, float]):
+    """Mean colour of the kept region's border, used for padding"""
+    left, top, right, bottom = (round(value) for value in box)
+    edges = [
+        image.crop((left, top, right, top + 1)),
+        image.crop((left, bottom - 1, right, bottom)),
+        image.crop((left, top, left + 1, bottom)),
+        image.crop((right - 1, top, right, bottom)),
+    ]
+    bands = len(image.getbands())
+    totals = [0.0] * bands
+    count = 0
+    for edge in edges:
+        stat = ImageStat.Stat(edge)
+        pixels = edge.width * edge.height
+        totals = [total + mean * pixels for total, mean in zip(totals, stat.mean)]
+        count += pixels
+    color = tuple(round(total / max(1, count)) for total in totals)
+    return color[0] if bands == 1 else color
+
+
+def render_rendition(image: Image.Image, platform: str) -> Image.Image:
+    """
+    Fit the base banner to a platform size with a single resample.
+    The most salient window is cropped to the target aspect ratio while that
+    loses no more than MAX_CROP of the long side, the rest is padded with
+    the border colour.
+    Args:
+        image: decoded base banner
+        platform: PLATFORM_SIZES key
+    Returns:
+        image of exactly PLATFORM_SIZES[platform]
+    """
+    target = PLATFORM_SIZES[platform]
+    box = _crop_box(image, target)
+    box_width, box_height = box[2] - box[0], box[3] - box[1]
+
+    scale = min(target[0] / box_width, target[1] / box_height)
+    fitted = (
+        min(target[0], max(1, round(box_width * scale))),
+        min(target[1], max(1, round(box_height * scale))),
+    )
+    resized = image.resize(fitted, Image.Resampling.LANCZOS, box=box)
+    if fitted == target:
+        return resized
+
+    canvas = Image.new(image.mode, target, _background(image, box))
+    canvas.paste(resized, ((target[0] - fitted[0]) // 2, (target[1] - fitted[1]) // 2))
+    return canvas
+
+
+class RenditionService:
+    """Platform sized renditions of a generated banner"""
+
+    async def generate_renditions(
+        self, base: SharedImage, platforms: List[str]
+    ) -> Dict[str, Union[EncodedImage, BaseException]]:
+        """
+        Render the base banner for every platform in the variant process pool.
+        Args:
+            base: shared base banner from VariantRenderer.share()
+            platforms: PLATFORM_SIZES keys, see platforms_for()
+        Returns:
+            encoded rendition per platform, or the exception it raised
+        """
+        results = await get_variant_renderer().render_renditions(base, platforms)
+        return dict(zip(platforms, results))
@@ -17,8 +17,14 @@ class S3Service:
         )
         self.bucket_name = get_settings().S3_BUCKET_NAME
 
-    def generate_s3_key(self, banner_name: str, platform: str) -> str:
-        """Generate unique S3 key for banner"""
+    def generate_s3_key(
+        self,
+        banner_name: str,
+        platform: str,
+        prefix: str = "banners",
+        extension: str = "png",
+    ) -> str:
+        """Generate unique S3 key for banner (or other media under `prefix`)"""
         timestamp = datetime.now().strftime("%Y/%m/%d")
         safe_name = "".join(
             c for c in banner_name if c.isalnum() or c in ("-", "_")
@@ -26,9 +32,8 @@ class S3Service:
         unique_id = hashlib.md5(
             f"{banner_name}{platform}{datetime.now().isoformat()}".encode()
         ).hexdigest()[:8]
-        return f"banners/{timestamp}/{platform}/{safe_name}_{unique_id}.png".replace(
-            "//", "/"
-        )
+        key = f"{prefix}/{timestamp}/{platform}/{safe_name}_{unique_id}.{extension}"
+        return key.replace("//", "/")
 
     async def upload_image(
         self, image_data: bytes, s3_key: str, content_type: str = "image/png"
@@ -60,19 +65,27 @@ class S3Service:
             raise Exception(f"S3 upload failed: {str(e)}")
 
     async def upload_byte(
-        self, byte: bytes, name: str, platform: str = "Facebook"
+        self,
+        byte: bytes,
+        name: str,
+        platform: str = "Facebook",
+        prefix: str = "banners",
+        extension: str = "png",
+        content_type: str = "image/png",
     ) -> str:
         """
         upload single byte to S3
         Args:
             takes bytes as input
+            prefix: top level key folder, e.g. banner_previews
+            extension / content_type: of the encoded bytes
         Returns:
             returns URL of the S3 uploaded img
 
         """
-        key = self.generate_s3_key(name, platform)
+        key = self.generate_s3_key(name, platform, prefix=prefix, extension=extension)
 
-        return await self.upload_image(byte, key)
+        return await self.upload_image(byte, key, content_type=content_type)
 
     async def delete_image(self, s3_key: str) -> bool:
         """Delete image from S3"""
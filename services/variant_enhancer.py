@@ -0,0 +1,100 @@
+from typing import Dict
+import numpy as np
+from PIL import Image, ImageFilter, ImageStat
+
+# ITU-R 601-2 luma, the weights PIL uses for convert("L")
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# ImageFilter.SMOOTH, the degenerate image of ImageEnhance.Sharpness
+SMOOTH_KERNEL = (1, 1, 1, 1, 5, 1, 1, 1, 1)
+SMOOTH_SCALE = 13
+
+# rows converted to float at a time
+STRIP_ROWS = 64
+
+
+def _fused_color(
+    pixels: np.ndarray,
+    mean_luma: float,
+    brightness: float,
+    contrast: float,
+    saturation: float,
+) -> np.ndarray:
+    """
+    Brightness, contrast and saturation of ImageEnhance in one pass.
+
+    With b, c, s the factors, x a pixel, L0 its luma and m the mean luma
+    after brightness, the Brightness -> Contrast -> Color chain reduces to
+        out = m(1 - c) + c*b*((1 - s)*L0 + s*x)
+    so a per pixel offset plus a scale of x, clipped once at the end. Rows
+    are processed in strips so the float working set stays small.
+    """
+    mean = brightness * mean_luma
+    scale = contrast * brightness * (saturation if pixels.ndim == 3 else 1.0)
+    luma_scale = contrast * brightness * (1 - saturation)
+
+    out = np.empty_like(pixels)
+    for top in range(0, pixels.shape[0], STRIP_ROWS):
+        x = pixels[top : top + STRIP_ROWS].astype(np.float32)
+        if x.ndim == 3:
+            offset = x @ LUMA_WEIGHTS
+            offset *= luma_scale
+            offset += mean * (1 - contrast)
+            offset = offset[..., None]
+        else:
+            offset = mean * (1 - contrast)
+
+        x *= scale
+        x += offset
+        np.clip(x, 0, 255, out=x)
+        np.rint(x, out=x)
+        out[top : top + STRIP_ROWS] = x
+    return out
+
+
+def _sharpen_filter(factor: float) -> ImageFilter.Kernel:
+    """
+    ImageEnhance.Sharpness(factor) as a single convolution:
+    factor * identity + (1 - factor) * SMOOTH.
+    """
+    weights = [(1 - factor) * weight for weight in SMOOTH_KERNEL]
+    weights[4] += factor * SMOOTH_SCALE
+    return ImageFilter.Kernel((3, 3), weights, scale=SMOOTH_SCALE)
+
+
+def enhance_image(image: Image.Image, params: Dict[str, float]) -> Image.Image:
+    """
+    Apply a variation_dict style in a single pass over the pixels.
+    Args:
+        image: L, RGB or RGBA base image, left untouched
+        params: brightness, contrast, saturation, sharpness and smoothness,
+            sharpness / smoothness of 0 skip that filter
+    Returns:
+        new enhanced image, alpha is carried over unchanged
+    """
+    brightness = params.get("brightness", 1)
+    contrast = params.get("contrast", 1)
+    saturation = params.get("saturation", 1)
+
+    if (brightness, contrast, saturation) == (1, 1, 1):
+        enhanced = image.copy()
+    else:
+        # the mean Contrast pulls towards, ImageStat keeps it in C
+        mean_luma = ImageStat.Stat(image.convert("L")).mean[0]
+        pixels = np.asarray(image)
+        if image.mode == "RGBA":
+            out = pixels.copy()
+            out[..., :3] = _fused_color(
+                pixels[..., :3], mean_luma, brightness, contrast, saturation
+            )
+        else:
+            out = _fused_color(pixels, mean_luma, brightness, contrast, saturation)
+        enhanced = Image.fromarray(out)
+
+    if params.get("sharpness", 0) > 0:
+        enhanced = enhanced.filter(_sharpen_filter(params["sharpness"]))
+
+    if params.get("smoothness", 0) > 0:
+        enhanced = enhanced.filter(ImageFilter.GaussianBlur(params["smoothness"]))
+
+    return enhanced
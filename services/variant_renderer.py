@@ -0,0 +1,247 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple, Union
+from PIL import Image
+
+from config.env_variables import get_settings
+from core.utils.logger import Logger
+from services.perceptual_hash import perceptual_hash
+from services.image_encoding import (
+    EncodedImage,
+    EncodingProfile,
+    GeneratedImage,
+    encode_image,
+    encoding_profile,
+)
+
+# modes whose raw pixels fully describe the image, others are converted first
+SHAREABLE_MODES = ("L", "RGB", "RGBA")
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block owned by the parent without adopting its cleanup"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    block = shared_memory.SharedMemory(name=name)
+    # the parent unlinks the block, the worker must not unlink it on exit
+    resource_tracker.unregister(block._name, "shared_memory")
+    return block
+
+
+@dataclass(frozen=True)
+class SharedImage:
+    """Decoded base banner whose pixels live in a shared memory block"""
+
+    shm_name: str
+    mode: str
+    size: Tuple[int, int]
+
+
+def _render_shared(
+    shared: SharedImage,
+    render: Callable[[Image.Image], Image.Image],
+    profile: EncodingProfile,
+) -> EncodedImage:
+    """Worker side: run `render` on the shared base pixels, hash and encode it"""
+    block = _attach(shared.shm_name)
+    base = None
+    try:
+        base = Image.frombuffer(
+            shared.mode, shared.size, block.buf, "raw", shared.mode, 0, 1
+        )
+        rendered = render(base)
+    finally:
+        # the image views the shared buffer, release it before closing
+        base = None
+        block.close()
+
+    encoded = encode_image(rendered, profile)
+    encoded.phash, encoded.color_hash = perceptual_hash(rendered)
+    return encoded
+
+
+def _render_variant(
+    shared: SharedImage, style: str, seed: float, profile: EncodingProfile
+) -> EncodedImage:
+    """Worker side: enhance the shared base with one style"""
+    from services.banner_variant_service import BannerVariantService
+
+    return _render_shared(
+        shared,
+        lambda base: BannerVariantService()._enhance_img(base, style, seed),
+        profile,
+    )
+
+
+def _render_rendition(
+    shared: SharedImage, platform: str, profile: EncodingProfile
+) -> EncodedImage:
+    """Worker side: crop / pad and resample the shared base to a platform size"""
+    from services.rendition_service import render_rendition
+
+    return _render_shared(
+        shared, lambda base: render_rendition(base, platform), profile
+    )
+
+
+def _decode(generated: GeneratedImage) -> Image.Image:
+    image = generated.decode()
+    if image.mode not in SHAREABLE_MODES:
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    return image
+
+
+@dataclass
+class VariantRendererStats:
+    rendered: int = 0
+    failed: int = 0
+    pool_restarts: int = 0
+
+
+class VariantRenderer:
+    """
+    Renders banner variants in a bounded process pool.
+
+    The base image is decoded once and its pixels are placed in a shared
+    memory block that every worker maps, so only the style or platform and
+    the encoded result cross the process boundary and the event loop never
+    runs PIL. Workers encode each output with its platform's encoding
+    profile along with a preview thumbnail.
+    """
+
+    def __init__(self, workers: int):
+        self.logger = Logger.get_logger(__name__)
+        self.workers = workers
+        self.stats = VariantRendererStats()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, forking a process that runs browser and client threads
+            # can deadlock the children
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    @asynccontextmanager
+    async def share(self, base: GeneratedImage) -> AsyncIterator[SharedImage]:
+        """
+        Decode the base banner once and expose its pixels to the workers.
+        Args:
+            base: model image payload, decoded here unless already decoded
+        Yields:
+            SharedImage valid until the context exits
+        """
+        image = await asyncio.to_thread(_decode, base)
+        pixels = image.tobytes()
+        block = shared_memory.SharedMemory(create=True, size=max(1, len(pixels)))
+        try:
+            block.buf[: len(pixels)] = pixels
+            del pixels
+            yield SharedImage(shm_name=block.name, mode=image.mode, size=image.size)
+        finally:
+            block.close()
+            block.unlink()
+
+    async def render(
+        self, shared: SharedImage, styles: List[Tuple[str, float]]
+    ) -> List[Union[EncodedImage, BaseException]]:
+        """
+        Render one variant per (style, seed), in parallel across workers.
+        Args:
+            shared: base banner from share()
+            styles: (style, seed) per variant
+        Returns:
+            encoded variant with preview, or the exception that variant raised
+        """
+        profile = encoding_profile()
+        return await self._map(
+            _render_variant,
+            [(shared, style, seed, profile) for style, seed in styles],
+        )
+
+    async def render_renditions(
+        self, shared: SharedImage, platforms: List[str]
+    ) -> List[Union[EncodedImage, BaseException]]:
+        """
+        Render the base banner at every platform size, in parallel.
+        Args:
+            shared: base banner from share()
+            platforms: PLATFORM_SIZES keys
+        Returns:
+            encoded rendition with preview, or the exception that platform raised
+        """
+        return await self._map(
+            _render_rendition,
+            [(shared, platform, encoding_profile(platform)) for platform in platforms],
+        )
+
+    async def _map(
+        self, worker: Callable[..., EncodedImage], calls: List[Tuple[Any, ...]]
+    ) -> List[Union[EncodedImage, BaseException]]:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        self._in_flight += len(calls)
+        try:
+            results = await asyncio.gather(
+                *[loop.run_in_executor(executor, worker, *args) for args in calls],
+                return_exceptions=True,
+            )
+        finally:
+            self._in_flight -= len(calls)
+
+        for result in results:
+            if not isinstance(result, BaseException):
+                self.stats.rendered += 1
+                continue
+
+            self.stats.failed += 1
+            self.logger.error(f"rendering failed: {result}")
+            if isinstance(result, BrokenProcessPool) and self._executor is executor:
+                # a crashed worker poisons the pool, start a fresh one
+                self.stats.pool_restarts += 1
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        return results
+
+    def stop(self):
+        """Shut the worker processes down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "rendered": self.stats.rendered,
+            "failed": self.stats.failed,
+            "pool_restarts": self.stats.pool_restarts,
+        }
+
+
+_variant_renderer: Optional[VariantRenderer] = None
+
+
+def get_variant_renderer() -> VariantRenderer:
+    """
+    Get the process-wide variant renderer.
+    """
+    global _variant_renderer
+
+    if _variant_renderer is None:
+        workers = get_settings().VARIANT_RENDER_WORKERS or os.cpu_count() or 1
+        _variant_renderer = VariantRenderer(workers=workers)
+    return _variant_renderer
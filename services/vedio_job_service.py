@@ -0,0 +1,232 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from google.genai import types
+
+from config.env_variables import get_settings
+from core.model.llm import VEO_MODEL, get_veo_operation, init_veo
+from core.model.scheduler import get_model_scheduler
+from core.utils.logger import Logger
+from services.job_store import Job, JobStatus, JobStore, get_job_store
+from services.s3_service import S3Service
+
+VEO_JOB_KIND = "veo_video"
+
+
+@dataclass
+class _PendingOperation:
+    job: Job
+    operation: types.GenerateVideosOperation
+    submitted_at: float
+    next_poll_at: float
+    interval: float
+    poll_failures: int = 0
+
+
+class VeoJobManager:
+    """
+    Runs veo generations as background jobs.
+
+    Submitting only starts the long running operation. A single poller task
+    multiplexes every outstanding operation, backing off per operation, and
+    uploads the finished videos to S3 so request handlers never wait on veo.
+    """
+
+    def __init__(
+        self,
+        job_store: JobStore,
+        initial_interval: float,
+        max_interval: float,
+        expected_seconds: float,
+        max_seconds: float,
+        max_poll_failures: int,
+    ):
+        self.logger = Logger.get_logger(__name__)
+        self.job_store = job_store
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.expected_seconds = expected_seconds
+        self.max_seconds = max_seconds
+        self.max_poll_failures = max_poll_failures
+        self._pending: Dict[str, _PendingOperation] = {}
+        self._tasks: set = set()
+        self._wakeup = asyncio.Event()
+        self._poller: Optional[asyncio.Task] = None
+
+    def submit(self, prompt: str, config: Optional[dict] = None) -> Job:
+        """
+        Queue a video generation.
+        Args:
+            prompt: video prompt
+            config: veo generation config overrides
+        Returns:
+            job to follow through get_job_store()
+        Raises:
+            ModelQueueFullError: veo submissions are already queued to the limit
+        """
+        get_model_scheduler().check_capacity(VEO_MODEL)
+
+        job = self.job_store.create(VEO_JOB_KIND)
+        task = asyncio.create_task(self._start(job, prompt, config))
+        # keep a reference so the submission is not garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _start(self, job: Job, prompt: str, config: Optional[dict]):
+        try:
+            operation = await init_veo(contents=prompt, config=config)
+        except Exception as e:
+            self.job_store.fail(job, str(e))
+            return
+
+        now = time.monotonic()
+        self._pending[job.id] = _PendingOperation(
+            job=job,
+            operation=operation,
+            submitted_at=now,
+            next_poll_at=now + self.initial_interval,
+            interval=self.initial_interval,
+        )
+        self.job_store.update(job, status=JobStatus.RUNNING, message="Generating video")
+
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_loop())
+        self._wakeup.set()
+
+    async def _poll_loop(self):
+        while self._pending:
+            now = time.monotonic()
+            next_poll_at = min(p.next_poll_at for p in self._pending.values())
+            if next_poll_at > now:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), timeout=next_poll_at - now
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = [p for p in self._pending.values() if p.next_poll_at <= now]
+            await asyncio.gather(*[self._poll(pending) for pending in due])
+
+    async def _poll(self, pending: _PendingOperation):
+        job = pending.job
+        try:
+            pending.operation = await get_veo_operation(pending.operation)
+            pending.poll_failures = 0
+        except Exception as e:
+            # keep the last known state and retry after the backoff
+            pending.poll_failures += 1
+            self.logger.warning(f"Polling veo job {job.id} failed: {e}")
+
+        elapsed = time.monotonic() - pending.submitted_at
+        if not pending.operation.done and (
+            pending.poll_failures >= self.max_poll_failures
+            or elapsed >= self.max_seconds
+        ):
+            del self._pending[job.id]
+            self.job_store.fail(
+                job,
+                f"veo operation unresolved after {round(elapsed)}s and "
+                f"{pending.poll_failures} failed polls",
+            )
+            return
+
+        if not pending.operation.done:
+            pending.interval = min(pending.interval * 1.5, self.max_interval)
+            pending.next_poll_at = time.monotonic() + pending.interval
+            # veo reports no progress, estimate it from the typical duration
+            self.job_store.update(
+                job, progress=min(0.9, 0.9 * elapsed / self.expected_seconds)
+            )
+            return
+
+        del self._pending[job.id]
+        task = asyncio.create_task(self._finish(job, pending.operation))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _finish(self, job: Job, operation: types.GenerateVideosOperation):
+        if operation.error:
+            self.job_store.fail(
+                job, str(operation.error.get("message", operation.error))
+            )
+            return
+
+        videos = (operation.response or operation.result).generated_videos or []
+        if not videos:
+            self.job_store.fail(job, "veo returned no videos")
+            return
+
+        self.job_store.update(job, progress=0.95, message="Uploading video")
+        try:
+            urls = await self._upload_videos(job, videos)
+        except Exception as e:
+            self.job_store.fail(job, f"video upload failed: {e}")
+            return
+
+        self.job_store.update(
+            job,
+            status=JobStatus.SUCCEEDED,
+            progress=1.0,
+            message="Video ready",
+            result={"videos": urls},
+        )
+
+    async def _upload_videos(
+        self, job: Job, videos: List[types.GeneratedVideo]
+    ) -> List[str]:
+        s3_service = S3Service()
+        urls = []
+        for n, generated_video in enumerate(videos):
+            video = generated_video.video
+            if not video.video_bytes:
+                # output_gcs_uri was configured, the video already lives there
+                urls.append(video.uri)
+                continue
+
+            extension = (video.mime_type or "video/mp4").split("/")[-1]
+            key = s3_service.generate_s3_key(
+                f"{job.id}_{n}", "veo", prefix="videos", extension=extension
+            )
+            urls.append(
+                await s3_service.upload_image(
+                    video.video_bytes, key, content_type=video.mime_type or "video/mp4"
+                )
+            )
+        return urls
+
+    async def stop(self):
+        """Cancel the poller and in-flight submissions on shutdown."""
+        for task in [self._poller, *self._tasks]:
+            if task is not None:
+                task.cancel()
+        self._poller = None
+
+    def stats(self) -> dict:
+        return {"pending_operations": len(self._pending)}
+
+
+_veo_job_manager: Optional[VeoJobManager] = None
+
+
+def get_veo_job_manager() -> VeoJobManager:
+    """
+    Get the process-wide veo job manager.
+    """
+    global _veo_job_manager
+
+    if _veo_job_manager is None:
+        settings = get_settings()
+        _veo_job_manager = VeoJobManager(
+            job_store=get_job_store(),
+            initial_interval=settings.VEO_POLL_INITIAL_INTERVAL,
+            max_interval=settings.VEO_POLL_MAX_INTERVAL,
+            expected_seconds=settings.VEO_EXPECTED_SECONDS,
+            max_seconds=settings.VEO_MAX_SECONDS,
+            max_poll_failures=settings.VEO_MAX_POLL_FAILURES,
+        )
+    return _veo_job_manager
@@ -1,11 +1,13 @@
 from typing import Optional
 
 
-from core.model.llm import init_veo, initialize_gemini, initialize_imagen
+from core.model.llm import initialize_gemini, initialize_imagen
 from core.prompt.ad_script_prompt import get_ad_script_banner
 from core.utils.logger import Logger
 from routers.banner.request_types import CreateVedioScriptRequest
+from services.job_store import Job
 from services.s3_storage_service import S3StorageService
+from services.vedio_job_service import get_veo_job_manager
 from global_type.product_base import ProductBase
 
 
@@ -79,7 +81,7 @@ class VedioService:
         prompt = get_ad_script_banner()
         # initialize_gemini(content=, )
 
-    async def create_vedio(self, prompt: str):
+    async def create_vedio(self, prompt: str) -> Job:
+        """Start a background veo generation, the job reports the video urls"""
 
-        response = init_veo(contents=prompt)
-        return response
+        return get_veo_job_manager().submit(prompt)
@@ -14,3 +14,35 @@ def str_to_float(val: str) -> float:
         return float(value)
     except ValueError as e:
         raise ValueError(f"invalid value type: {val}")
+
+
+def extract_price(text: str) -> str:
+    """Returns the first number of a price text ("₹1,299.00" -> "1299.00")"""
+    import re
+
+    if not text:
+        return ""
+
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(text))
+    return match.group(0).replace(",", "") if match else ""
+
+
+def extract_stock(availability: str) -> str:
+    """
+    Map a scraped availability onto the product prompt's stock values: the
+    number of items left or "out_of_stock". Schema.org urls
+    ("https://schema.org/OutOfStock") and extract_product_info.js values are
+    accepted, availability without a count ("in_stock") returns "".
+    """
+    import re
+
+    if not availability:
+        return ""
+
+    text = str(availability).strip()
+    key = re.sub(r"[^a-z]", "", text.rsplit("/", 1)[-1].lower())
+    if key in ("outofstock", "soldout", "discontinued"):
+        return "out_of_stock"
+
+    match = re.search(r"\d+", text)
+    return match.group(0) if match else ""
@@ -0,0 +1,64 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# query params that only track the visit and never change the product page
+TRACKING_PARAMS = {
+    "gclid",
+    "gclsrc",
+    "dclid",
+    "fbclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_gl",
+    "ref",
+    "ref_",
+    "referrer",
+    "srsltid",
+    "spm",
+    "si",
+    "trk",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_")
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a product url so the same page always maps to the same key.
+    Lowercases scheme and host, drops www., default ports, fragments and
+    tracking params, sorts the remaining query and trims trailing slashes.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+
+    parts = urlsplit(url)
+    scheme = (parts.scheme or "https").lower()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = "/".join(segment for segment in parts.path.split("/") if segment)
+    path = f"/{path}" if path else "/"
+
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _is_tracking_param(name)
+        )
+    )
+
+    return urlunsplit((scheme, host, path, query, ""))